@@ -0,0 +1,15 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path: str):
+    # 先写 <path>.tmp 再 os.replace，读者不会看到写了一半的文件
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,204 @@
+import argparse
+import gzip
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import google.protobuf
+
+import create_db
+import proto.data_pb2 as data_pb2
+from json_stream import write_json
+from name_search import write_search_index
+from succession_compat import write_compat
+from synthetic_mdb import generate, scaled_counts, write_icons
+from text_data import TextData
+from umdb_container import write_sectioned
+from umdb_index import build_index
+
+DEFAULT_SCALES = (0.5, 1.0, 2.0)
+
+
+def _timed(steps: dict, name: str, fn, *args, **kwargs):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    steps[name] = (time.perf_counter() - wall, time.process_time() - cpu)
+    return result
+
+
+def run_once(db_path: str, icon_dir: str, out_dir: str, icon_mode: str):
+    # 与 create_db.main() 的串行路径相同的步骤，逐步计时
+    steps, sizes = {}, {}
+    cursor = create_db.open_db(db_path)
+    texts = _timed(
+        steps, "load_text_data", TextData.load, cursor, create_db.TEXT_CATEGORIES
+    )
+    stage_options = {
+        "populate_charas": {
+            "icon_mode": icon_mode,
+            "output_dir": out_dir,
+            "icon_dir": icon_dir,
+        },
+    }
+    pb = data_pb2.UMDatabase()
+    pb.version = "benchmark"
+    for populate in create_db.STAGES:
+        name = populate.__name__
+        part = _timed(
+            steps,
+            name,
+            create_db.build_stage,
+            populate,
+            cursor,
+            texts,
+            stage_options.get(name, {}),
+        )
+        sizes[name] = len(part)
+        pb.MergeFromString(part)
+    cursor.connection.close()
+
+    pb.index.CopyFrom(_timed(steps, "build_index", build_index, pb))
+    serialized = _timed(steps, "serialize", pb.SerializeToString)
+    sizes["serialized"] = len(serialized)
+    compressed = _timed(steps, "gzip", gzip.compress, serialized, mtime=0)
+    sizes["gzip"] = len(compressed)
+
+    for mode, indent in (("pretty", 2), ("compact", None)):
+        path = os.path.join(out_dir, f"umdb.{mode}.json")
+
+        def dump():
+            with open(path, "w", encoding="utf-8") as f:
+                write_json(f, pb, indent=indent)
+
+        _timed(steps, f"json_{mode}", dump)
+        sizes[f"json_{mode}"] = os.path.getsize(path)
+
+    outputs = (
+        ("sectioned", write_sectioned, "umdb.sections"),
+        ("succession_compat", write_compat, "succession_compat.bin"),
+        ("name_search", write_search_index, "name_search.bin"),
+    )
+    for name, write, filename in outputs:
+        path = os.path.join(out_dir, filename)
+        _timed(steps, name, write, path, pb)
+        sizes[name] = os.path.getsize(path)
+    return steps, sizes
+
+
+def run_scale(scale: float, work_dir: str, repeat: int, icon_mode: str, seed: int):
+    scale_dir = os.path.join(work_dir, f"scale_{scale:g}")
+    out_dir = os.path.join(scale_dir, "out")
+    os.makedirs(out_dir, exist_ok=True)
+    db_path = os.path.join(scale_dir, "master.mdb")
+    icon_dir = os.path.join(scale_dir, "icons")
+    counts = scaled_counts(scale)
+    info = generate(db_path, counts, seed)
+    write_icons(icon_dir, info["chara_ids"], seed)
+
+    runs = [run_once(db_path, icon_dir, out_dir, icon_mode) for _ in range(repeat)]
+    steps = {}
+    for name in runs[0][0]:
+        walls = [r[0][name][0] for r in runs]
+        cpus = [r[0][name][1] for r in runs]
+        steps[name] = {
+            "wall": statistics.median(walls),
+            "wall_min": min(walls),
+            "cpu": statistics.median(cpus),
+        }
+    return {
+        "scale": scale,
+        "counts": counts,
+        "text_rows": info["text_rows"],
+        "steps": steps,
+        "bytes": runs[-1][1],
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    # 打印与 baseline 中相同 scale 的各步骤耗时比值（>1 表示变慢）
+    previous = {r["scale"]: r for r in baseline["scales"]}
+    for result in results["scales"]:
+        base = previous.get(result["scale"])
+        if base is None:
+            continue
+        print(f"scale {result['scale']:g} vs {baseline['meta'].get('commit')}:")
+        for name, step in result["steps"].items():
+            if name not in base["steps"] or not base["steps"][name]["wall"]:
+                continue
+            ratio = step["wall"] / base["steps"][name]["wall"]
+            print(f"  {name:36s} {step['wall'] * 1000:10.2f} ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark create_db.py on synthetic master.mdb files"
+    )
+    parser.add_argument(
+        "--scales",
+        type=lambda s: [float(x) for x in s.split(",")],
+        default=list(DEFAULT_SCALES),
+        help="comma separated scale factors for synthetic_mdb row counts",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--icon_mode", choices=create_db.ICON_MODES, default="inline")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="previous --output file to compare with")
+    parser.add_argument("--work_dir", help="keep generated files here")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="umdb_bench_")
+    try:
+        scales = []
+        for scale in args.scales:
+            print(f"Running scale {scale:g}...")
+            scales.append(
+                run_scale(scale, work_dir, args.repeat, args.icon_mode, args.seed)
+            )
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "protobuf": google.protobuf.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "icon_mode": args.icon_mode,
+            "seed": args.seed,
+        },
+        "scales": scales,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from atomic_file import atomic_write
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def fingerprint(cursor: sqlite3.Cursor, queries, extra=()) -> str:
+    h = hashlib.sha256()
+    for query in queries:
+        h.update(query.encode("utf-8"))
+        # 逐行迭代，避免 fetchall 把整张 text_data 读进内存
+        for row in cursor.execute(query):
+            h.update(repr(row).encode("utf-8"))
+    for item in extra:
+        h.update(repr(item).encode("utf-8"))
+    return h.hexdigest()
+
+
+def directory_signature(path: str, prefix: str = "") -> list:
+    if not os.path.isdir(path):
+        return []
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.startswith(prefix):
+                st = entry.stat()
+                entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    entries.sort()
+    return entries
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BuildCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+        self.manifest = {"stages": {}, "outputs": {}}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable build cache manifest: {e}")
+
+    def _part_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.binarypb")
+
+    def get(self, name: str, stage_fingerprint: str) -> bytes | None:
+        if self.manifest["stages"].get(name) != stage_fingerprint:
+            return None
+        try:
+            with open(self._part_path(name), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, name: str, stage_fingerprint: str, data: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with atomic_write(self._part_path(name)) as f:
+            f.write(data)
+        self.manifest["stages"][name] = stage_fingerprint
+
+    def output_unchanged(self, key: str, digest: str, paths) -> bool:
+        if self.manifest["outputs"].get(key) != digest:
+            return False
+        return all(os.path.exists(p) for p in paths)
+
+    def set_output(self, key: str, digest: str):
+        self.manifest["outputs"][key] = digest
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with atomic_write(self.manifest_path) as f:
+            f.write(json.dumps(self.manifest, indent=2, sort_keys=True).encode("utf-8"))
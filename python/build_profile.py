@@ -0,0 +1,123 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class CountingCursor:
+    # 包装 sqlite3.Cursor，统计取回的行数；其余属性直接转发
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.rows = 0
+
+    def execute(self, *args):
+        self._cursor.execute(*args)
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _peak_rss() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BuildProfiler:
+    # enabled=False 时 step() 不做任何记录，调用方无需区分
+    def __init__(self, enabled: bool = False, cprofile_dir: str | None = None):
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir
+        self.records = []
+        if cprofile_dir:
+            os.makedirs(cprofile_dir, exist_ok=True)
+
+    @contextmanager
+    def step(self, name: str, kind: str, cursor=None):
+        record = {"name": name, "kind": kind}
+        if not self.enabled:
+            yield record
+            return
+        rows_before = cursor.rows if isinstance(cursor, CountingCursor) else None
+        rss_before = _peak_rss()
+        # tracemalloc 只能看到 Python 分配的内存，且会拖慢被测步骤
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        profile = cProfile.Profile() if self.cprofile_dir else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.process_time() - cpu
+            record["py_peak_delta"] = tracemalloc.get_traced_memory()[1] - traced_before
+            if not tracing:
+                tracemalloc.stop()
+            rss_after = _peak_rss()
+            record["peak_rss_delta"] = (
+                rss_after - rss_before if rss_before is not None else None
+            )
+            if rows_before is not None:
+                record["rows_fetched"] = cursor.rows - rows_before
+            if profile is not None:
+                path = os.path.join(self.cprofile_dir, f"{name}.prof")
+                profile.dump_stats(path)
+                record["cprofile"] = path
+            self.records.append(record)
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def write(self, path: str, meta: dict):
+        report = {"meta": meta, "steps": self.records}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def print_summary(self):
+        print(
+            f"{'step':36s} {'wall ms':>10s} {'cpu ms':>10s} {'rows':>8s} {'bytes':>10s}"
+        )
+        for r in self.records:
+            print(
+                f"{r['name']:36s} {r['wall'] * 1000:10.2f} {r['cpu'] * 1000:10.2f} "
+                f"{r.get('rows_fetched', ''):>8} {r.get('bytes', ''):>10}"
+            )
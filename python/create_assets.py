@@ -1,23 +1,224 @@
+import argparse
+import hashlib
+import json
 import os
 import shutil
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 SOURCE_DIR = "D:\\Apps\\umas\\export\\Texture2D"
 TARGET_DIR = "./assets/chr_icon"
+ATLAS_DIR = "./assets/chr_icon_atlas"
+# 与 create_db.py --incremental 共用缓存目录
+STATE_DIR = ".umdb_cache"
+ATLAS_MAX_SIZE = 2048
 
-os.makedirs(TARGET_DIR, exist_ok=True)
 pattern = re.compile(r"chr_icon_training_(\d+)\.png$")
+# build_atlas 写出的页：chr_icon_<label>_<n>.png
+page_pattern = re.compile(r"chr_icon_(?:\d+|full)_\d+\.png$")
 
-for filename in os.listdir(SOURCE_DIR):
-    match = pattern.match(filename)
-    if not match:
-        continue
 
-    chara_id = match.group(1)
-    src_path = os.path.join(SOURCE_DIR, filename)
-    dst_path = os.path.join(TARGET_DIR, f"{chara_id}.png")
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-    shutil.copy2(src_path, dst_path)
-    print(f"Copied: {filename} → {chara_id}.png")
 
-print("Done.")
+def load_state(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: str, state: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def scan_sources(source_dir: str, previous: dict, jobs: int) -> dict:
+    # {chara_id: {"filename", "mtime_ns", "size", "sha256"}}
+    # mtime 与 size 都未变的文件沿用上次的哈希，不再读取
+    entries = {}
+    with os.scandir(source_dir) as it:
+        for entry in it:
+            match = pattern.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            st = entry.stat()
+            entries[match.group(1)] = {
+                "filename": entry.name,
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+            }
+
+    to_hash = []
+    for chara_id, info in entries.items():
+        old = previous.get(chara_id)
+        if (
+            old
+            and old.get("mtime_ns") == info["mtime_ns"]
+            and old.get("size") == info["size"]
+        ):
+            info["sha256"] = old["sha256"]
+        else:
+            to_hash.append(chara_id)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        paths = [os.path.join(source_dir, entries[i]["filename"]) for i in to_hash]
+        for chara_id, digest in zip(to_hash, executor.map(_sha256, paths)):
+            entries[chara_id]["sha256"] = digest
+    return dict(sorted(entries.items(), key=lambda kv: int(kv[0])))
+
+
+def copy_icons(
+    source_dir: str, target_dir: str, sources: dict, previous: dict, jobs: int
+):
+    os.makedirs(target_dir, exist_ok=True)
+
+    def copy_one(item):
+        chara_id, info = item
+        dst_path = os.path.join(target_dir, f"{chara_id}.png")
+        old = previous.get(chara_id)
+        if old and old.get("sha256") == info["sha256"] and os.path.exists(dst_path):
+            return False
+        shutil.copy2(os.path.join(source_dir, info["filename"]), dst_path)
+        print(f"Copied: {info['filename']} → {chara_id}.png")
+        return True
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        copied = sum(executor.map(copy_one, sources.items()))
+    print(f"Copied {copied}, skipped {len(sources) - copied} unchanged.")
+
+
+def _load_icon(path: str, size: int | None):
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert("RGBA")
+        if size:
+            img.thumbnail((size, size), Image.LANCZOS)
+        return img
+
+
+def pack_shelves(dims: list, max_size: int) -> list:
+    # 按高度排序后逐行摆放，超出 max_size 换页；返回与输入同序的 (page, x, y)
+    placements = [None] * len(dims)
+    order = sorted(range(len(dims)), key=lambda i: (-dims[i][1], i))
+    page, x, y, shelf_h = 0, 0, 0, 0
+    for i in order:
+        w, h = dims[i]
+        if x + w > max_size:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + h > max_size:
+            page, x, y, shelf_h = page + 1, 0, 0, 0
+        placements[i] = (page, x, y)
+        x += w
+        shelf_h = max(shelf_h, h)
+    return placements
+
+
+def build_atlas(
+    source_dir: str, atlas_dir: str, sources: dict, sizes: list, jobs: int
+) -> dict:
+    from PIL import Image
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    # 页数或 sizes 变少时，上次多出的页不会被覆盖，先全部删掉
+    for filename in os.listdir(atlas_dir):
+        if page_pattern.match(filename):
+            os.remove(os.path.join(atlas_dir, filename))
+    ids = list(sources)
+    paths = [os.path.join(source_dir, sources[i]["filename"]) for i in ids]
+    index = {}
+    for size in sizes:
+        label = str(size) if size else "full"
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            images = list(executor.map(lambda p: _load_icon(p, size), paths))
+        dims = [img.size for img in images]
+        placements = pack_shelves(dims, ATLAS_MAX_SIZE)
+
+        page_count = max((p[0] for p in placements), default=-1) + 1
+        page_extent = [[0, 0] for _ in range(page_count)]
+        for (page, x, y), (w, h) in zip(placements, dims):
+            page_extent[page][0] = max(page_extent[page][0], x + w)
+            page_extent[page][1] = max(page_extent[page][1], y + h)
+        pages = [Image.new("RGBA", tuple(ext), (0, 0, 0, 0)) for ext in page_extent]
+        rects = {}
+        for chara_id, img, (page, x, y) in zip(ids, images, placements):
+            pages[page].paste(img, (x, y))
+            rects[chara_id] = [page, x, y, img.size[0], img.size[1]]
+
+        page_files = []
+        for n, page_img in enumerate(pages):
+            filename = f"chr_icon_{label}_{n}.png"
+            page_img.save(os.path.join(atlas_dir, filename), optimize=True)
+            page_files.append(filename)
+        index[label] = {"pages": page_files, "rects": rects}
+        print(f"Atlas {label}: {len(ids)} icons in {len(page_files)} page(s).")
+
+    with open(os.path.join(atlas_dir, "atlas.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source_dir", default=SOURCE_DIR)
+    parser.add_argument(
+        "--mode",
+        choices=("copy", "atlas"),
+        default="copy",
+        help="copy: one png per chara in assets/chr_icon; "
+        "atlas: packed sprite sheets plus an id→rect index",
+    )
+    parser.add_argument("--target_dir", default=TARGET_DIR)
+    parser.add_argument("--atlas_dir", default=ATLAS_DIR)
+    parser.add_argument(
+        "--sizes",
+        default="",
+        help="comma separated max edge lengths for atlas icons, "
+        "empty keeps the original size",
+    )
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--force", action="store_true", help="ignore the saved state")
+    args = parser.parse_args()
+
+    state_path = os.path.join(STATE_DIR, f"assets_{args.mode}.json")
+    state = {} if args.force else load_state(state_path)
+    previous = state.get("sources", {})
+    sources = scan_sources(args.source_dir, previous, args.jobs)
+
+    if args.mode == "copy":
+        copy_icons(args.source_dir, args.target_dir, sources, previous, args.jobs)
+        save_state(state_path, {"sources": sources})
+    else:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()] or [0]
+        config = {
+            "sizes": sizes,
+            "max_size": ATLAS_MAX_SIZE,
+            "atlas_dir": os.path.abspath(args.atlas_dir),
+        }
+        unchanged = (
+            state.get("config") == config
+            and {k: v["sha256"] for k, v in previous.items()}
+            == {k: v["sha256"] for k, v in sources.items()}
+            and os.path.exists(os.path.join(args.atlas_dir, "atlas.json"))
+        )
+        if unchanged:
+            print("Atlas unchanged, skip.")
+        else:
+            build_atlas(args.source_dir, args.atlas_dir, sources, sizes, args.jobs)
+        save_state(state_path, {"config": config, "sources": sources})
+
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,28 @@
 import argparse
 import base64
 import gzip
-import json
+import inspect
 import sqlite3
 import os
+import time
 from collections import defaultdict
-from google.protobuf import json_format
+from concurrent.futures import ProcessPoolExecutor
+from urllib.request import pathname2url
 import proto.data_pb2 as data_pb2
+from build_cache import BuildCache, directory_signature, file_digest, fingerprint
+from build_profile import BuildProfiler, CountingCursor
+from icon_store import ICON_PACK_FILENAME, IconPack, read_icons
+from json_stream import JSON_MODES, write_json
+from name_search import SEARCH_FILENAME, write_search_index
+from succession_compat import COMPAT_FILENAME, write_compat
+from text_data import TextData
+from umdb_container import SECTIONED_FILENAME, write_sectioned
+from umdb_index import build_index
 
 SOURCE_ICON_DIR = r"D:\Apps\umas\export\Texture2D"
+OUTPUT_DIR = "assets/data"
+ICON_MODES = ("inline", "pack")
+OUTPUT_FORMATS = ("gzip", "sectioned", "both")
 LIVE_SHOW_CONTEXT_BY_ID = {
     40000: "擅长率 +5",
     40001: "友情加成 +5%",
@@ -33,70 +47,129 @@ LIVE_SHOW_CONTEXT_BY_ID = {
     40020: "支援卡事件 +1",
 }
 
+# populate_* 读取的 SQL，--incremental 的 STAGE_SOURCES 指纹直接复用同一份
+SUPPORT_CARD_QUERY = "SELECT id, chara_id, command_id FROM support_card_data;"
+SUCCESSION_RELATION_QUERY = (
+    "SELECT relation_type, relation_point FROM succession_relation;"
+)
+SUCCESSION_RELATION_MEMBER_QUERY = (
+    "SELECT id, relation_type, chara_id FROM succession_relation_member ORDER BY id;"
+)
+RACE_INSTANCE_QUERY = """SELECT ri.id, rcs.distance, rcs.ground
+                      FROM race_instance AS ri
+                      LEFT JOIN race AS r ON ri.race_id = r.id
+                      LEFT JOIN race_course_set AS rcs ON r.course_set = rcs.id;"""
+WINS_SADDLE_QUERY = """SELECT s.id, s.priority, s.group_id, s.win_saddle_type, %s
+                      FROM single_mode_wins_saddle AS s;""" % ", ".join(
+    ["s.race_instance_id_%d" % i for i in range(1, 9)]
+)
+SPECIAL_CASE_RACE_QUERY = """SELECT p1.race_instance_id, p1.program_group, p1.race_permission
+                      FROM single_mode_program AS p1
+                      INNER JOIN single_mode_program AS p2
+                      ON p1.base_program_id != 0 AND p2.base_program_id = 0
+                          AND p1.base_program_id = p2.id
+                          AND p1.race_instance_id != p2.race_instance_id;"""
+# populate_special_case_race 追加 WHERE program_group IN (...)；指纹覆盖整张表
+CHARA_PROGRAM_QUERY = "SELECT chara_id, program_group FROM single_mode_chara_program"
+SKILL_QUERY = "SELECT id, grade_value, tag_id FROM skill_data;"
+LIVE_SQUARE_QUERY = """SELECT s.id,
+                  s.square_title_text_id,
+                  s.square_content_text_id,
+                  s.master_bonus_id,
+                  s.square_type,
+                  s.perf_type_1, s.perf_value_1,
+                  s.perf_type_2, s.perf_value_2,
+                  s.perf_type_3, s.perf_value_3,
+                  s.perf_type_4, s.perf_value_4,
+                  s.perf_type_5, s.perf_value_5
+           FROM single_mode_live_square AS s;"""
 
-def open_db(path: str) -> sqlite3.Cursor:
-    connection = sqlite3.connect(path)
-    return connection.cursor()
 
+def open_db(path: str, immutable: bool = False) -> sqlite3.Cursor:
+    # master.mdb 始终只读打开；immutable=1 再跳过文件锁与变更检测，
+    # 多个 worker 可同时安全读取
+    uri = "file:%s?mode=ro" % pathname2url(os.path.abspath(path))
+    if immutable:
+        uri += "&immutable=1"
+    connection = sqlite3.connect(uri, uri=True)
+    return connection.cursor()
 
-def populate_charas(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("""SELECT t1."index", t1.text, t2.text FROM text_data AS t1
-                      LEFT JOIN text_data AS t2 on t1."index"=t2."index"
-                      WHERE t1.category=170 AND t2.category=7;""")
-    rows = cursor.fetchall()
 
-    for row in rows:
+def populate_charas(
+    pb: data_pb2.UMDatabase,
+    cursor: sqlite3.Cursor,
+    texts: TextData,
+    icon_mode: str = "inline",
+    output_dir: str = OUTPUT_DIR,
+    icon_dir: str = SOURCE_ICON_DIR,
+):
+    charas = []
+    for index, name in texts.items(170):
+        cast_name = texts.get(7, index)
+        if cast_name is None:
+            continue
         c = data_pb2.Chara()
-        c.id = row[0]
-        c.name = row[1]
-        c.cast_name = row[2]
-        icon_filename = f"chr_icon_training_{c.id}.png"
-        icon_path = os.path.join(SOURCE_ICON_DIR, icon_filename)
-
-        if os.path.exists(icon_path):
-            try:
-                with open(icon_path, "rb") as img_file:
-                    img_data = img_file.read()
-                    base64_bytes = base64.b64encode(img_data)
-                    base64_string = base64_bytes.decode("utf-8")
-                    # 设置 Base64 Data URI
-                    c.icon_url = f"data:image/png;base64,{base64_string}"
-            except Exception as e:
-                print(f"Error encoding image for chara {c.id}: {e}")
-        else:
-            pass
-
+        c.id = index
+        c.name = name
+        c.cast_name = cast_name
+        charas.append(c)
+
+    icons = read_icons(
+        [
+            (c.id, os.path.join(icon_dir, f"chr_icon_training_{c.id}.png"))
+            for c in charas
+        ]
+    )
+    pack = IconPack() if icon_mode == "pack" else None
+    for c, img_data in zip(charas, icons):
+        if img_data is not None:
+            if pack is not None:
+                # 图片写入 chr_icon.pack，icon_url 只保存 offset/length 引用
+                c.icon_url = pack.add(img_data)
+            else:
+                base64_string = base64.b64encode(img_data).decode("utf-8")
+                # 设置 Base64 Data URI
+                c.icon_url = f"data:image/png;base64,{base64_string}"
         pb.chara.append(c)
 
+    if pack is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        pack.write(os.path.join(output_dir, pack.filename))
 
-def populate_cards(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("SELECT `index`, text FROM text_data WHERE category=5;")
-    rows = cursor.fetchall()
-    for row in rows:
+
+def populate_cards(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    for index, name in texts.items(5):
         c = data_pb2.Card()
-        c.id = row[0]
-        c.name = row[1]
+        c.id = index
+        c.name = name
         pb.card.append(c)
 
 
-def populate_support_cards(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("""SELECT s.id, t.text, s.chara_id, s.command_id
-                      FROM support_card_data AS s
-                      JOIN text_data AS t ON t."index"=s.id AND t.category=75;""")
+def populate_support_cards(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(SUPPORT_CARD_QUERY)
     rows = cursor.fetchall()
     for row in rows:
+        name = texts.get(75, row[0])
+        if name is None:
+            continue
         c = data_pb2.SupportCard()
         c.id = row[0]
-        c.name = row[1]
-        c.chara_id = row[2]
-        c.command_id = row[3]
+        c.name = name
+        c.chara_id = row[1]
+        c.command_id = row[2]
         pb.support_card.append(c)
 
 
-def populate_succession_relation(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
+def populate_succession_relation(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
     relations = {}
 
-    cursor.execute("SELECT relation_type, relation_point FROM succession_relation;")
+    cursor.execute(SUCCESSION_RELATION_QUERY)
     rows = cursor.fetchall()
     for row in rows:
         r = data_pb2.SuccessionRelation()
@@ -104,9 +177,7 @@ def populate_succession_relation(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor
         r.relation_point = row[1]
         relations[r.relation_type] = r
 
-    cursor.execute(
-        "SELECT id, relation_type, chara_id FROM succession_relation_member ORDER BY id;"
-    )
+    cursor.execute(SUCCESSION_RELATION_MEMBER_QUERY)
     rows = cursor.fetchall()
     for row in rows:
         member = data_pb2.SuccessionRelation.Member()
@@ -117,50 +188,43 @@ def populate_succession_relation(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor
     pb.succession_relation.extend(relations.values())
 
 
-def populate_race_instance(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("""SELECT ri.id, rcs.distance, rcs.ground, t.text
-                      FROM race_instance AS ri
-                      LEFT JOIN race AS r ON ri.race_id = r.id
-                      LEFT JOIN race_course_set AS rcs ON r.course_set = rcs.id
-                      LEFT JOIN text_data AS t ON t."index" = ri.id AND t.category = 29;""")
+def populate_race_instance(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(RACE_INSTANCE_QUERY)
     rows = cursor.fetchall()
     for row in rows:
         r = data_pb2.RaceInstance()
         r.id = row[0]
         r.distance = row[1]
         r.ground_type = row[2]
-        r.name = row[3] or "Unknown"
+        r.name = texts.get(29, row[0]) or "Unknown"
         pb.race_instance.append(r)
 
 
-def populate_wins_saddle(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    instance_id_columns = ", ".join(["s.race_instance_id_%d" % i for i in range(1, 9)])
-    cursor.execute(
-        """SELECT s.id, t.text, s.priority, s.group_id, s.win_saddle_type, %s
-                      FROM single_mode_wins_saddle AS s
-                      JOIN text_data AS t
-                      ON t.category=111 AND s.id = t."index";"""
-        % instance_id_columns
-    )
+def populate_wins_saddle(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(WINS_SADDLE_QUERY)
     rows = cursor.fetchall()
     for row in rows:
+        name = texts.get(111, row[0])
+        if name is None:
+            continue
         w = data_pb2.WinsSaddle()
         w.id = row[0]
-        w.name = row[1]
-        w.priority = row[2]
-        w.group_id = row[3]
-        w.type = row[4]
-        w.race_instance_id.extend([i for i in row[5:] if i > 0])
+        w.name = name
+        w.priority = row[1]
+        w.group_id = row[2]
+        w.type = row[3]
+        w.race_instance_id.extend([i for i in row[4:] if i > 0])
         pb.wins_saddle.append(w)
 
 
-def populate_special_case_race(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("""SELECT p1.race_instance_id, p1.program_group, p1.race_permission
-                      FROM single_mode_program AS p1
-                      INNER JOIN single_mode_program AS p2
-                      ON p1.base_program_id != 0 AND p2.base_program_id = 0
-                          AND p1.base_program_id = p2.id
-                          AND p1.race_instance_id != p2.race_instance_id;""")
+def populate_special_case_race(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(SPECIAL_CASE_RACE_QUERY)
     rows = cursor.fetchall()
     races = []
     groups_to_query = set()
@@ -174,9 +238,8 @@ def populate_special_case_race(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
 
     if groups_to_query:
         cursor.execute(
-            """SELECT chara_id, program_group FROM single_mode_chara_program
-                          WHERE program_group IN (%s);"""
-            % ", ".join(groups_to_query)
+            "%s WHERE program_group IN (%s);"
+            % (CHARA_PROGRAM_QUERY, ", ".join(groups_to_query))
         )
         rows = cursor.fetchall()
         groups = defaultdict(list)
@@ -188,69 +251,56 @@ def populate_special_case_race(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
             pb.special_case_race.append(race)
 
 
-def populate_skills(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("""SELECT s.id, t.text, s.grade_value, s.tag_id
-                      FROM skill_data AS s
-                      JOIN text_data AS t ON t."index"=s.id AND t.category=47;""")
+def populate_skills(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(SKILL_QUERY)
     rows = cursor.fetchall()
     for row in rows:
+        name = texts.get(47, row[0])
+        if name is None:
+            continue
         r = data_pb2.Skill()
         r.id = row[0]
-        r.name = row[1]
-        r.grade_value = row[2]
-        r.tag_id.extend(row[3].split("/"))
+        r.name = name
+        r.grade_value = row[1]
+        r.tag_id.extend(row[2].split("/"))
         pb.skill.append(r)
 
 
-def populate_team_stadium_score_bonus(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("SELECT `index`, text FROM text_data WHERE category=148;")
-    rows = cursor.fetchall()
-    for row in rows:
+def populate_team_stadium_score_bonus(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    for index, name in texts.items(148):
         r = data_pb2.TeamStadiumScoreBonus()
-        r.id = row[0]
-        r.name = row[1]
+        r.id = index
+        r.name = name
         pb.team_stadium_score_bonus.append(r)
 
 
-def populate_stories(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute("SELECT `index`, text FROM text_data WHERE category=181;")
-    rows = cursor.fetchall()
-    for row in rows:
+def populate_stories(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    for index, name in texts.items(181):
         r = data_pb2.Story()
-        r.id = row[0]
-        r.name = row[1]
+        r.id = index
+        r.name = name
         pb.story.append(r)
 
 
-def populate_live_songs(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
-    cursor.execute(
-        """SELECT s.id,
-                  s.square_title_text_id,
-                  tt.text,
-                  s.square_content_text_id,
-                  tc.text,
-                  s.master_bonus_id,
-                  s.square_type,
-                  s.perf_type_1, s.perf_value_1,
-                  s.perf_type_2, s.perf_value_2,
-                  s.perf_type_3, s.perf_value_3,
-                  s.perf_type_4, s.perf_value_4,
-                  s.perf_type_5, s.perf_value_5
-           FROM single_mode_live_square AS s
-           LEFT JOIN text_data AS tt
-             ON tt.category=209 AND tt."index"=s.square_title_text_id
-           LEFT JOIN text_data AS tc
-             ON tc.category=207 AND tc."index"=s.square_content_text_id;"""
-    )
+def populate_live_songs(
+    pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor, texts: TextData
+):
+    cursor.execute(LIVE_SQUARE_QUERY)
     rows = cursor.fetchall()
     for row in rows:
         r = data_pb2.LiveSong()
         r.id = row[0]
-        r.square_title = row[2]
-        r.square_content = row[4]
-        r.master_bonus_id = row[5]
-        r.square_type = row[6]
-        perf_pairs = [(row[i], row[i + 1]) for i in range(7, 17, 2)]
+        r.square_title = texts.get(209, row[1])
+        r.square_content = texts.get(207, row[2])
+        r.master_bonus_id = row[3]
+        r.square_type = row[4]
+        perf_pairs = [(row[i], row[i + 1]) for i in range(5, 15, 2)]
         for perf_type, perf_value in perf_pairs:
             if perf_type <= 0:
                 break
@@ -261,36 +311,405 @@ def populate_live_songs(pb: data_pb2.UMDatabase, cursor: sqlite3.Cursor):
         pb.live_song.append(r)
 
 
+STAGES = (
+    populate_charas,
+    populate_cards,
+    populate_support_cards,
+    populate_succession_relation,
+    populate_race_instance,
+    populate_wins_saddle,
+    populate_special_case_race,
+    populate_skills,
+    populate_team_stadium_score_bonus,
+    populate_stories,
+    populate_live_songs,
+)
+STAGES_BY_NAME = {p.__name__: p for p in STAGES}
+
+# 各 stage 用到的 text_data category，由 TextData 一次性读入
+STAGE_TEXT_CATEGORIES = {
+    "populate_charas": (170, 7),
+    "populate_cards": (5,),
+    "populate_support_cards": (75,),
+    "populate_race_instance": (29,),
+    "populate_wins_saddle": (111,),
+    "populate_skills": (47,),
+    "populate_team_stadium_score_bonus": (148,),
+    "populate_stories": (181,),
+    "populate_live_songs": (209, 207),
+}
+TEXT_CATEGORIES = sorted({c for cs in STAGE_TEXT_CATEGORIES.values() for c in cs})
+
+# --incremental 用来计算各 stage 指纹的源数据查询，与 populate_* 使用同一份 SQL
+STAGE_SOURCES = {
+    "populate_charas": (),
+    "populate_cards": (),
+    "populate_support_cards": (SUPPORT_CARD_QUERY,),
+    "populate_succession_relation": (
+        SUCCESSION_RELATION_QUERY,
+        SUCCESSION_RELATION_MEMBER_QUERY,
+    ),
+    "populate_race_instance": (RACE_INSTANCE_QUERY,),
+    "populate_wins_saddle": (WINS_SADDLE_QUERY,),
+    "populate_special_case_race": (
+        SPECIAL_CASE_RACE_QUERY,
+        CHARA_PROGRAM_QUERY + ";",
+    ),
+    "populate_skills": (SKILL_QUERY,),
+    "populate_team_stadium_score_bonus": (),
+    "populate_stories": (),
+    "populate_live_songs": (LIVE_SQUARE_QUERY,),
+}
+# populate_* 依赖的其它模块（连同 data.proto 的描述符），其源码改动同样让缓存失效
+STAGE_HELPERS = {
+    "populate_charas": (IconPack,),
+}
+
+
+def _module_source(obj) -> str:
+    return inspect.getsource(inspect.getmodule(obj))
+
+
+def stage_fingerprint(
+    populate, cursor: sqlite3.Cursor, texts: TextData, options: dict
+) -> str:
+    name = populate.__name__
+    # 代码改动同样需要让缓存失效
+    extra = [
+        inspect.getsource(populate),
+        _module_source(TextData),
+        data_pb2.DESCRIPTOR.serialized_pb,
+        sorted(options.items()),
+    ]
+    extra.extend(_module_source(h) for h in STAGE_HELPERS.get(name, ()))
+    for category in STAGE_TEXT_CATEGORIES.get(name, ()):
+        extra.append(category)
+        extra.extend(texts.items(category))
+    if populate is populate_charas:
+        icon_dir = options.get("icon_dir", SOURCE_ICON_DIR)
+        extra.extend(directory_signature(icon_dir, "chr_icon_training_"))
+    elif populate is populate_live_songs:
+        extra.append(sorted(LIVE_SHOW_CONTEXT_BY_ID.items()))
+    return fingerprint(cursor, STAGE_SOURCES[name], extra)
+
+
+def stage_outputs(populate, options: dict) -> list:
+    # stage 在 UMDatabase 之外写出的文件；缺失时即使命中缓存也要重建
+    if populate is populate_charas and options.get("icon_mode") == "pack":
+        return [os.path.join(options["output_dir"], ICON_PACK_FILENAME)]
+    return []
+
+
+def build_stage(
+    populate, cursor: sqlite3.Cursor, texts: TextData, options: dict
+) -> bytes:
+    part = data_pb2.UMDatabase()
+    populate(part, cursor, texts, **options)
+    return part.SerializeToString()
+
+
+def count_messages(part: bytes) -> int:
+    pb = data_pb2.UMDatabase.FromString(part)
+    return sum(len(v) for f, v in pb.ListFields() if f.is_repeated)
+
+
+def _run_stage(
+    name: str,
+    cursor: sqlite3.Cursor,
+    texts: TextData,
+    cache: BuildCache | None,
+    stage_options: dict,
+) -> tuple[bytes, str | None, bool]:
+    populate = STAGES_BY_NAME[name]
+    options = stage_options.get(name, {})
+    if cache is None:
+        return build_stage(populate, cursor, texts, options), None, True
+    fp = stage_fingerprint(populate, cursor, texts, options)
+    part = cache.get(name, fp)
+    if part is None or not all(
+        os.path.exists(p) for p in stage_outputs(populate, options)
+    ):
+        return build_stage(populate, cursor, texts, options), fp, True
+    return part, fp, False
+
+
+def run_stage(
+    name: str,
+    cursor: sqlite3.Cursor,
+    texts: TextData,
+    cache: BuildCache | None,
+    stage_options: dict,
+    profiler: BuildProfiler | None = None,
+) -> tuple[bytes, str | None, bool]:
+    profiler = profiler or BuildProfiler()
+    with profiler.step(name, "stage", cursor) as record:
+        part, fp, rebuilt = _run_stage(name, cursor, texts, cache, stage_options)
+    if profiler.enabled:
+        record["cached"] = not rebuilt
+        record["bytes"] = len(part)
+        record["messages"] = count_messages(part)
+    return part, fp, rebuilt
+
+
+_worker_cursor = None
+_worker_texts = None
+_worker_cache = None
+_worker_stage_options = None
+_worker_profiler = None
+
+
+def _init_worker(
+    db_path: str,
+    texts: TextData,
+    cache_dir: str | None,
+    stage_options: dict,
+    profile: bool,
+    cprofile_dir: str | None,
+):
+    global _worker_cursor, _worker_texts, _worker_cache, _worker_stage_options
+    global _worker_profiler
+    _worker_cursor = open_db(db_path, immutable=True)
+    if profile:
+        _worker_cursor = CountingCursor(_worker_cursor)
+    _worker_texts = texts
+    # worker 只读缓存，写回统一由主进程完成
+    _worker_cache = BuildCache(cache_dir) if cache_dir is not None else None
+    _worker_stage_options = stage_options
+    _worker_profiler = BuildProfiler(profile, cprofile_dir)
+
+
+def _run_stage_in_worker(name: str):
+    # 返回 (run_stage 的结果, 本次的 profile 记录)
+    result = run_stage(
+        name,
+        _worker_cursor,
+        _worker_texts,
+        _worker_cache,
+        _worker_stage_options,
+        _worker_profiler,
+    )
+    records = list(_worker_profiler.records)
+    _worker_profiler.records.clear()
+    return result, records
+
+
+def _is_within(path: str, directory: str) -> bool:
+    path, directory = os.path.abspath(path), os.path.abspath(directory)
+    try:
+        return os.path.commonpath([path, directory]) == directory
+    except ValueError:
+        # Windows 上不同盘符的路径不可能位于 assets/ 之内
+        return False
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--db_path", default="master.mdb")
     parser.add_argument("--version", default="test")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-run populate stages whose source data changed",
+    )
+    parser.add_argument("--cache_dir", default=".umdb_cache")
+    parser.add_argument(
+        "--icon_dir",
+        default=SOURCE_ICON_DIR,
+        help="directory containing chr_icon_training_<chara_id>.png",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="run populate stages on N worker processes",
+    )
+    parser.add_argument(
+        "--icon_mode",
+        choices=ICON_MODES,
+        default="inline",
+        help="inline: base64 data URI in Chara.icon_url; "
+        "pack: deduplicated chr_icon.pack with offset:length references",
+    )
+    parser.add_argument(
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="gzip",
+        help="gzip: umdb.binarypb.gz; sectioned: umdb.sections with one "
+        "compressed section per repeated field",
+    )
+    parser.add_argument(
+        "--json",
+        choices=JSON_MODES,
+        default="pretty",
+        help="how to write umdb.json: pretty (indent=2), compact, or none to skip it",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build_profile.json",
+        help="write per-step time, rows, messages, bytes and memory to this "
+        "JSON report (default build_profile.json); memory tracing slows steps down",
+    )
+    parser.add_argument(
+        "--cprofile_dir",
+        help="with --profile, also dump a cProfile <step>.prof file per step here",
+    )
+    parser.add_argument(
+        "--compat_dir",
+        help="also write the succession compatibility table (succession_compat.bin) "
+        f"here; off by default, must be outside {OUTPUT_DIR}",
+    )
+    parser.add_argument(
+        "--search_dir",
+        help="also write the name search index (name_search.bin) here; "
+        f"off by default, must be outside {OUTPUT_DIR}",
+    )
     args = parser.parse_args()
+    # assets/ 随应用打包发布，离线分析用的大文件不能写进去
+    for flag in ("compat_dir", "search_dir"):
+        if getattr(args, flag) and _is_within(getattr(args, flag), "assets"):
+            parser.error(f"--{flag} must be outside assets/")
+    started = time.perf_counter(), time.process_time()
+    profiler = BuildProfiler(args.profile is not None, args.cprofile_dir)
 
     pb = data_pb2.UMDatabase()
     pb.version = args.version
 
-    cursor = open_db(args.db_path)
-
-    for p in (
-        populate_charas,
-        populate_cards,
-        populate_support_cards,
-        populate_succession_relation,
-        populate_race_instance,
-        populate_wins_saddle,
-        populate_special_case_race,
-        populate_skills,
-        populate_team_stadium_score_bonus,
-        populate_stories,
-        populate_live_songs,
-    ):
-        p(pb, cursor)
-    os.makedirs("assets/data", exist_ok=True)
-    with open("assets/data/umdb.binarypb.gz", "wb") as f:
-        f.write(gzip.compress(pb.SerializeToString(), mtime=0))
-    with open("assets/data/umdb.json", "w", encoding="utf-8") as f:
-        json.dump(json_format.MessageToDict(pb), f, ensure_ascii=False, indent=2)
+    cache = BuildCache(args.cache_dir) if args.incremental else None
+    names = [p.__name__ for p in STAGES]
+    stage_options = {
+        "populate_charas": {
+            "icon_mode": args.icon_mode,
+            "output_dir": OUTPUT_DIR,
+            "icon_dir": args.icon_dir,
+        },
+    }
+
+    # 并行时主进程只读取文本，各 stage 在 worker 中各自打开数据库
+    cursor = open_db(args.db_path, immutable=args.jobs > 1)
+    if profiler.enabled:
+        cursor = CountingCursor(cursor)
+    with profiler.step("load_text_data", "input", cursor) as record:
+        texts = TextData.load(cursor, TEXT_CATEGORIES)
+    record["messages"] = len(texts.texts)
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(args.jobs, len(names)),
+            initializer=_init_worker,
+            initargs=(
+                args.db_path,
+                texts,
+                args.cache_dir if cache is not None else None,
+                stage_options,
+                profiler.enabled,
+                args.cprofile_dir,
+            ),
+        ) as executor:
+            results = []
+            for result, records in executor.map(_run_stage_in_worker, names):
+                results.append(result)
+                profiler.extend(records)
+    else:
+        results = [
+            run_stage(name, cursor, texts, cache, stage_options, profiler)
+            for name in names
+        ]
+
+    # 按 STAGES 顺序合并，保证与串行构建的输出逐字节一致
+    with profiler.step("merge", "output"):
+        for name, (part, fp, rebuilt) in zip(names, results):
+            if cache is not None:
+                if rebuilt:
+                    cache.put(name, fp, part)
+                print(f"{'Rebuilt' if rebuilt else 'Cached'}: {name}")
+            # 每个 stage 只写自己的 repeated 字段，直接拼接序列化结果即可
+            pb.MergeFromString(part)
+    # 派生索引随数据一起发布，应用启动时无需再计算
+    with profiler.step("build_index", "output") as record:
+        pb.index.CopyFrom(build_index(pb))
+    if profiler.enabled:
+        record["bytes"] = pb.index.ByteSize()
+
+    def finish():
+        if cache is not None:
+            cache.save()
+        if profiler.enabled:
+            profiler.print_summary()
+            profiler.write(
+                args.profile,
+                {
+                    "version": args.version,
+                    "db_path": args.db_path,
+                    "jobs": args.jobs,
+                    "incremental": args.incremental,
+                    "icon_mode": args.icon_mode,
+                    "output_format": args.output_format,
+                    "json": args.json,
+                    "compat_dir": args.compat_dir,
+                    "search_dir": args.search_dir,
+                    "wall": time.perf_counter() - started[0],
+                    "cpu": time.process_time() - started[1],
+                },
+            )
+            print(f"Wrote profile report to {args.profile}")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    binary_path = os.path.join(OUTPUT_DIR, "umdb.binarypb.gz")
+    sectioned_path = os.path.join(OUTPUT_DIR, SECTIONED_FILENAME)
+    json_path = os.path.join(OUTPUT_DIR, "umdb.json")
+    compat_path = args.compat_dir and os.path.join(args.compat_dir, COMPAT_FILENAME)
+    search_path = args.search_dir and os.path.join(args.search_dir, SEARCH_FILENAME)
+    write_gzip = args.output_format in ("gzip", "both")
+    write_sections = args.output_format in ("sectioned", "both")
+    with profiler.step("serialize", "output") as record:
+        serialized = pb.SerializeToString()
+    record["bytes"] = len(serialized)
+    if cache is not None:
+        outputs = [path for path in (compat_path, search_path) if path]
+        if args.json != "none":
+            outputs.append(json_path)
+        if write_gzip:
+            outputs.append(binary_path)
+        if write_sections:
+            outputs.append(sectioned_path)
+        for populate in STAGES:
+            outputs.extend(
+                stage_outputs(populate, stage_options.get(populate.__name__, {}))
+            )
+        digest = (
+            f"{file_digest(serialized)} {args.output_format} {args.json} "
+            f"{compat_path or ''} {search_path or ''}"
+        )
+        if cache.output_unchanged("umdb", digest, outputs):
+            print("Outputs unchanged, skip writing.")
+            finish()
+            return
+        cache.set_output("umdb", digest)
+
+    def write_gzip_file(path: str, pb):
+        with open(path, "wb") as f:
+            f.write(gzip.compress(serialized, mtime=0))
+
+    def write_json_file(path: str, pb):
+        with open(path, "w", encoding="utf-8") as f:
+            write_json(f, pb, indent=2 if args.json == "pretty" else None)
+
+    steps = [
+        ("write_gzip", write_gzip_file, binary_path, write_gzip),
+        ("write_sectioned", write_sectioned, sectioned_path, write_sections),
+        ("write_compat", write_compat, compat_path, bool(compat_path)),
+        ("write_search_index", write_search_index, search_path, bool(search_path)),
+        ("write_json", write_json_file, json_path, args.json != "none"),
+    ]
+    for name, write, path, enabled in steps:
+        if not enabled:
+            continue
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with profiler.step(name, "output") as record:
+            write(path, pb)
+        record["bytes"] = os.path.getsize(path)
+    finish()
 
 
 if __name__ == "__main__":
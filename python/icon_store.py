@@ -0,0 +1,71 @@
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_file import atomic_write
+
+ICON_PACK_FILENAME = "chr_icon.pack"
+ICON_READ_WORKERS = 8
+
+# icon_url 形如 "chr_icon.pack#<offset>:<length>"，路径相对于 assets/data
+_REF_PATTERN = re.compile(r"^(?P<name>[^#]+)#(?P<offset>\d+):(?P<length>\d+)$")
+
+
+def _read_icon(item) -> bytes | None:
+    chara_id, path = item
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as img_file:
+            return img_file.read()
+    except Exception as e:
+        print(f"Error reading image for chara {chara_id}: {e}")
+        return None
+
+
+def read_icons(items) -> list:
+    # items: [(chara_id, path), ...]，按输入顺序返回文件内容，不存在或读取失败为 None
+    with ThreadPoolExecutor(max_workers=ICON_READ_WORKERS) as executor:
+        return list(executor.map(_read_icon, items))
+
+
+def parse_icon_ref(ref: str) -> tuple[str, int, int] | None:
+    m = _REF_PATTERN.match(ref)
+    if not m:
+        return None
+    return m.group("name"), int(m.group("offset")), int(m.group("length"))
+
+
+class IconPack:
+    def __init__(self, filename: str = ICON_PACK_FILENAME):
+        self.filename = filename
+        self.blobs = []
+        self.refs = {}
+        self.size = 0
+
+    def add(self, data: bytes) -> str:
+        # 按内容哈希去重，相同图片只存一份
+        digest = hashlib.sha256(data).digest()
+        ref = self.refs.get(digest)
+        if ref is None:
+            ref = f"{self.filename}#{self.size}:{len(data)}"
+            self.refs[digest] = ref
+            self.blobs.append(data)
+            self.size += len(data)
+        return ref
+
+    def write(self, path: str):
+        with atomic_write(path) as f:
+            for blob in self.blobs:
+                f.write(blob)
+
+
+def read_packed_icon(data_dir: str, ref: str) -> bytes | None:
+    parsed = parse_icon_ref(ref)
+    if parsed is None:
+        return None
+    name, offset, length = parsed
+    with open(os.path.join(data_dir, name), "rb") as f:
+        f.seek(offset)
+        return f.read(length)
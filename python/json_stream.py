@@ -0,0 +1,60 @@
+import json
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
+
+JSON_MODES = ("pretty", "compact", "none")
+
+
+def _field_value(pb, field):
+    # 借助只含该字段的临时消息，保证与 MessageToDict 的取值格式一致
+    shell = type(pb)()
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        getattr(shell, field.name).CopyFrom(getattr(pb, field.name))
+    else:
+        setattr(shell, field.name, getattr(pb, field.name))
+    return json_format.MessageToDict(shell)[field.json_name]
+
+
+def write_json(f, pb, indent: int | None = 2):
+    # 逐个 repeated 元素写出 MessageToDict(pb)，避免一次性构造整个 dict。
+    # indent=2 时与 json.dump(MessageToDict(pb), f, ensure_ascii=False, indent=2)
+    # 输出完全一致；indent=None 时不输出任何空白。
+    if indent is None:
+        item_sep, key_sep, newline, pad, item_pad = ",", ":", "", "", ""
+    else:
+        item_sep, key_sep, newline = ",", ": ", "\n"
+        pad = " " * indent
+        item_pad = pad * 2
+    separators = (item_sep, key_sep)
+
+    def dumps(value, prefix: str):
+        text = json.dumps(
+            value, ensure_ascii=False, indent=indent, separators=separators
+        )
+        if indent is None:
+            return text
+        # JSON 字符串中不会出现裸换行，可以逐行补上外层缩进
+        return text.replace("\n", "\n" + prefix)
+
+    fields = pb.ListFields()
+    if not fields:
+        f.write("{}")
+        return
+    f.write("{" + newline)
+    for n, (field, value) in enumerate(fields):
+        key = json.dumps(field.json_name, ensure_ascii=False)
+        f.write(pad + key + key_sep)
+        if field.is_repeated and field.type == FieldDescriptor.TYPE_MESSAGE:
+            f.write("[" + newline)
+            for i, item in enumerate(value):
+                if i:
+                    f.write(item_sep + newline)
+                f.write(item_pad + dumps(json_format.MessageToDict(item), item_pad))
+            f.write(newline + pad + "]")
+        else:
+            f.write(dumps(_field_value(pb, field), pad))
+        if n + 1 < len(fields):
+            f.write(item_sep)
+        f.write(newline)
+    f.write("}")
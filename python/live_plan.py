@@ -0,0 +1,170 @@
+import argparse
+import gzip
+import itertools
+
+import numpy as np
+
+import proto.data_pb2 as data_pb2
+
+# 与 src/renderer/utils/liveRecommend.ts 中的 PERF_TYPE_TO_NOTE_KEY 一致
+PERF_TYPE_NAMES = {1: "da", 2: "pa", 3: "vo", 4: "vi", 5: "me"}
+
+
+def build_live_matrix(pb: data_pb2.UMDatabase, index: data_pb2.UMDatabaseIndex):
+    # 需在 index.live_song 建好之后调用；同一 perf_type 出现多次时累加
+    perf_types = sorted({t for song in pb.live_song for t in song.perf_type})
+    column = {t: i for i, t in enumerate(perf_types)}
+    values = np.zeros((len(index.live_song.id), len(perf_types)), dtype=np.int64)
+    for row, position in enumerate(index.live_song.position):
+        song = pb.live_song[position]
+        for perf_type, perf_value in zip(song.perf_type, song.perf_value):
+            values[row, column[perf_type]] += perf_value
+        index.live_square_type.append(song.square_type)
+        index.live_master_bonus_id.append(song.master_bonus_id)
+    index.live_perf_type.extend(perf_types)
+    index.live_perf_value.extend(values.ravel().tolist())
+
+
+class LivePlanner:
+    # plan 为 live square 行号数组，-1 表示空位；一批 plan 即 (batch, length) 的矩阵
+    def __init__(self, pb: data_pb2.UMDatabase):
+        index = pb.index
+        self.song_ids = np.array(index.live_song.id, dtype=np.int32)
+        self.perf_types = np.array(index.live_perf_type, dtype=np.int32)
+        self.values = np.array(index.live_perf_value, dtype=np.int64).reshape(
+            len(self.song_ids), len(self.perf_types)
+        )
+        self.square_type = np.array(index.live_square_type, dtype=np.int32)
+        self.master_bonus_id = np.array(index.live_master_bonus_id, dtype=np.int32)
+        # 末尾补一行 0，使 -1 直接索引到空位
+        self._values = np.vstack(
+            [self.values, np.zeros((1, len(self.perf_types)), dtype=np.int64)]
+        )
+
+    def rows(self, song_ids) -> np.ndarray:
+        song_ids = np.asarray(song_ids, dtype=np.int32)
+        rows = np.searchsorted(self.song_ids, song_ids)
+        rows = np.minimum(rows, max(len(self.song_ids) - 1, 0))
+        if len(song_ids) and (
+            not len(self.song_ids) or (self.song_ids[rows] != song_ids).any()
+        ):
+            raise KeyError(f"unknown live square in {song_ids.tolist()}")
+        return rows
+
+    def perf_vector(self, values: dict) -> np.ndarray:
+        # {perf_type 或 "da"/"pa"/...: value} -> 与 perf_types 对齐的向量
+        names = {name: t for t, name in PERF_TYPE_NAMES.items()}
+        out = np.zeros(len(self.perf_types), dtype=np.int64)
+        for key, value in values.items():
+            perf_type = names.get(key, key)
+            out[np.flatnonzero(self.perf_types == perf_type)] = value
+        return out
+
+    def song_weights(self, weights=None, by_master_bonus=None) -> np.ndarray:
+        # 默认每首 1 分；weights 为 {song_id: w}，by_master_bonus 为 {master_bonus_id: w}
+        out = np.ones(len(self.song_ids), dtype=np.float64)
+        for bonus_id, w in (by_master_bonus or {}).items():
+            out[self.master_bonus_id == bonus_id] = w
+        for song_id, w in (weights or {}).items():
+            out[self.rows([song_id])[0]] = w
+        return out
+
+    def plan_cost(self, plans) -> np.ndarray:
+        return self._values[np.asarray(plans)].sum(axis=1)
+
+    def score(self, plans, budget, weights=None):
+        # 返回 (score, cost, feasible)；超出 budget 的 plan 得分为 -inf
+        plans = np.asarray(plans)
+        cost = self.plan_cost(plans)
+        feasible = (cost <= np.asarray(budget)).all(axis=1)
+        if weights is None:
+            weights = np.ones(len(self.song_ids))
+        score = np.append(weights, 0.0)[plans].sum(axis=1)
+        return np.where(feasible, score, -np.inf), cost, feasible
+
+    def candidate_rows(self, candidates=None, square_types=None) -> np.ndarray:
+        rows = (
+            np.arange(len(self.song_ids))
+            if candidates is None
+            else np.unique(self.rows(candidates))
+        )
+        if square_types is not None:
+            rows = rows[np.isin(self.square_type[rows], list(square_types))]
+        return rows
+
+    def enumerate_plans(self, max_length: int, rows, batch_size: int = 65536):
+        # 按长度 1..max_length 枚举所有不重复组合，逐批返回 (batch, max_length)
+        rows = np.asarray(rows)
+        for length in range(1, min(max_length, len(rows)) + 1):
+            combos = itertools.combinations(range(len(rows)), length)
+            while True:
+                chunk = np.fromiter(
+                    itertools.islice(combos, batch_size),
+                    dtype=np.dtype((np.int64, length)),
+                )
+                if not len(chunk):
+                    break
+                plans = np.full((len(chunk), max_length), -1, dtype=np.int64)
+                plans[:, :length] = rows[chunk]
+                yield plans
+
+    def best_plans(
+        self,
+        budget,
+        max_length: int,
+        k: int = 10,
+        weights=None,
+        candidates=None,
+        square_types=None,
+        batch_size: int = 65536,
+    ) -> list:
+        # 穷举并保留得分最高的 k 个 plan；同分时剩余 note 总数多者优先
+        rows = self.candidate_rows(candidates, square_types)
+        budget = np.asarray(budget)
+        best_plans = np.empty((0, max_length), dtype=np.int64)
+        best_score = np.empty(0)
+        best_cost = np.empty(0, dtype=np.int64)
+        for plans in self.enumerate_plans(max_length, rows, batch_size):
+            score, cost, feasible = self.score(plans, budget, weights)
+            plans = np.concatenate([best_plans, plans[feasible]])
+            score = np.concatenate([best_score, score[feasible]])
+            total = np.concatenate([best_cost, cost[feasible].sum(axis=1)])
+            keep = np.lexsort((total, -score))[:k]
+            best_plans, best_score, best_cost = plans[keep], score[keep], total[keep]
+
+        out = []
+        for plan, score in zip(best_plans, best_score):
+            song_ids = self.song_ids[plan[plan >= 0]].tolist()
+            out.append((song_ids, float(score), self.plan_cost(plan[None])[0]))
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search live plans exhaustively")
+    parser.add_argument("--umdb", default="assets/data/umdb.binarypb.gz")
+    for name in PERF_TYPE_NAMES.values():
+        parser.add_argument(f"--{name}", type=int, default=0, help="available notes")
+    parser.add_argument("--max_length", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--square_type", type=int, action="append")
+    parser.add_argument("--song_id", type=int, action="append", help="candidates")
+    args = parser.parse_args()
+
+    with open(args.umdb, "rb") as f:
+        pb = data_pb2.UMDatabase.FromString(gzip.decompress(f.read()))
+    planner = LivePlanner(pb)
+    budget = planner.perf_vector(
+        {name: getattr(args, name) for name in PERF_TYPE_NAMES.values()}
+    )
+    for song_ids, score, cost in planner.best_plans(
+        budget,
+        args.max_length,
+        args.k,
+        candidates=args.song_id,
+        square_types=args.square_type,
+    ):
+        print(f"{score:g}\t{song_ids}\tcost={cost.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import struct
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+import proto.data_pb2 as data_pb2
+from atomic_file import atomic_write
+from umdb_container import encode_varint
+
+# 文件布局（小端）：
+#   MAGIC | u16 len + version(utf-8) | u32 doc_count | u32 gram_count |
+#   u8[doc_count] doc_field | i32[doc_count] doc_entity_id |
+#   u32[doc_count + 1] text_offsets | 名称 utf-8 |
+#   u32[gram_count + 1] gram_offsets | gram utf-8（按码位升序）|
+#   u32[gram_count + 1] posting_offsets | posting 数据
+# 每个 gram 的 posting 为升序 doc 序号的差分，逐个以 varint 编码。
+MAGIC = b"UMDBSRC1"
+SEARCH_FILENAME = "name_search.bin"
+# 单字 gram 用于输入第一个字时的即时搜索
+GRAM_SIZES = (1, 2, 3)
+
+# (UMDatabase 字段, 名称字段)，下标即 doc_field
+SEARCH_FIELDS = (
+    ("chara", "name"),
+    ("chara", "cast_name"),
+    ("card", "name"),
+    ("support_card", "name"),
+    ("skill", "name"),
+    ("race_instance", "name"),
+    ("story", "name"),
+)
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def ngrams(text: str) -> set:
+    return {text[i : i + n] for n in GRAM_SIZES for i in range(len(text) - n + 1)}
+
+
+def decode_varints(buffer) -> np.ndarray:
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    values = (data & 0x7F).astype(np.int64) << (7 * shifts)
+    return np.add.reduceat(values, starts)
+
+
+def write_search_index(path: str, pb: data_pb2.UMDatabase):
+    doc_fields, doc_ids, texts = [], [], []
+    for field_code, (table, field) in enumerate(SEARCH_FIELDS):
+        for m in getattr(pb, table):
+            text = normalize(getattr(m, field))
+            if not text:
+                continue
+            doc_fields.append(field_code)
+            doc_ids.append(m.id)
+            texts.append(text)
+
+    postings = {}
+    for doc, text in enumerate(texts):
+        for gram in ngrams(text):
+            postings.setdefault(gram, []).append(doc)
+    grams = sorted(postings)
+
+    encoded_texts = [t.encode("utf-8") for t in texts]
+    encoded_grams = [g.encode("utf-8") for g in grams]
+    encoded_postings = []
+    for gram in grams:
+        previous = 0
+        chunk = bytearray()
+        for doc in postings[gram]:
+            chunk += encode_varint(doc - previous)
+            previous = doc
+        encoded_postings.append(bytes(chunk))
+
+    def offsets(chunks) -> bytes:
+        return (
+            np.concatenate(([0], np.cumsum([len(c) for c in chunks])))
+            .astype("<u4")
+            .tobytes()
+        )
+
+    version = pb.version.encode("utf-8")
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(_U16.pack(len(version)))
+        f.write(version)
+        f.write(_U32.pack(len(texts)))
+        f.write(_U32.pack(len(grams)))
+        f.write(np.array(doc_fields, dtype="u1").tobytes())
+        f.write(np.array(doc_ids, dtype="<i4").tobytes())
+        f.write(offsets(encoded_texts))
+        f.write(b"".join(encoded_texts))
+        f.write(offsets(encoded_grams))
+        f.write(b"".join(encoded_grams))
+        f.write(offsets(encoded_postings))
+        f.write(b"".join(encoded_postings))
+
+
+class NameSearch:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a name search index")
+        pos = len(MAGIC)
+        (version_len,) = _U16.unpack_from(data, pos)
+        pos += _U16.size
+        self.version = data[pos : pos + version_len].decode("utf-8")
+        pos += version_len
+        doc_count, gram_count = struct.unpack_from("<II", data, pos)
+        pos += 8
+
+        def array(dtype, count):
+            nonlocal pos
+            a = np.frombuffer(data, dtype=dtype, count=count, offset=pos)
+            pos += a.nbytes
+            return a
+
+        def strings(count):
+            nonlocal pos
+            ends = array("<u4", count + 1)
+            blob = data[pos : pos + int(ends[-1])]
+            pos += int(ends[-1])
+            return [blob[ends[i] : ends[i + 1]].decode("utf-8") for i in range(count)]
+
+        self.doc_fields = array("u1", doc_count)
+        self.doc_ids = array("<i4", doc_count)
+        self.texts = strings(doc_count)
+        self.grams = strings(gram_count)
+        self.posting_offsets = array("<u4", gram_count + 1)
+        self._postings = data[pos : pos + int(self.posting_offsets[-1])]
+
+    def postings(self, gram: str) -> np.ndarray:
+        i = bisect_left(self.grams, gram)
+        if i >= len(self.grams) or self.grams[i] != gram:
+            return np.empty(0, dtype=np.int64)
+        return self._decode(i)
+
+    def _decode(self, i: int) -> np.ndarray:
+        start, end = self.posting_offsets[i], self.posting_offsets[i + 1]
+        return np.cumsum(decode_varints(self._postings[start:end]))
+
+    def search(
+        self, query: str, limit: int = 20, tables=None, fuzzy: bool = False
+    ) -> list:
+        # 返回 [(table, field, entity_id, name, score)]，name 为归一化后的名称。
+        # 默认只返回包含完整查询串的结果；fuzzy 时允许只命中一半以上 gram。
+        query = normalize(query.strip())
+        if not query:
+            return []
+        n = max(s for s in GRAM_SIZES if s <= len(query))
+        grams = sorted(g for g in ngrams(query) if len(g) == n)
+        lists = [self.postings(g) for g in grams]
+        gram_count = len(grams)
+        if not any(len(p) for p in lists):
+            return []
+        if fuzzy:
+            candidates, hits = np.unique(np.concatenate(lists), return_counts=True)
+        else:
+            # 完整匹配必须命中全部 gram，从最短的 posting 开始求交集
+            lists.sort(key=len)
+            candidates = lists[0]
+            for p in lists[1:]:
+                candidates = np.intersect1d(candidates, p, assume_unique=True)
+            hits = np.full(len(candidates), gram_count)
+
+        if tables is not None:
+            codes = [i for i, (t, _) in enumerate(SEARCH_FIELDS) if t in tables]
+            mask = np.isin(self.doc_fields[candidates], codes)
+            candidates, hits = candidates[mask], hits[mask]
+
+        results = []
+        for doc, hit in zip(candidates.tolist(), hits.tolist()):
+            text = self.texts[doc]
+            contains = query in text
+            if not contains and (not fuzzy or hit * 2 < gram_count):
+                continue
+            score = hit / gram_count
+            if contains:
+                score += 1.0
+                if text.startswith(query):
+                    score += 0.5
+                if text == query:
+                    score += 1.0
+            # 同分时名称越短越接近查询
+            score -= len(text) * 1e-4
+            results.append((score, doc))
+        results.sort(key=lambda r: (-r[0], r[1]))
+
+        out = []
+        for score, doc in results[:limit]:
+            table, field = SEARCH_FIELDS[self.doc_fields[doc]]
+            out.append(
+                (table, field, int(self.doc_ids[doc]), self.texts[doc], round(score, 4))
+            )
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search UMDB names")
+    parser.add_argument("query")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--table", action="append", help="restrict to these tables")
+    parser.add_argument("--fuzzy", action="store_true")
+    parser.add_argument(
+        "--path",
+        required=True,
+        help=f"{SEARCH_FILENAME} written by create_db.py --search_dir",
+    )
+    args = parser.parse_args()
+
+    index = NameSearch(args.path)
+    for table, field, entity_id, name, score in index.search(
+        args.query, args.limit, args.table, args.fuzzy
+    ):
+        print(f"{score}\t{table}.{field}\t{entity_id}\t{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+import argparse
+import glob
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import msgpack
+import numpy as np
+
+from race_scenario import (
+    EVENT_DTYPE,
+    RaceScenario,
+    frame_dtype,
+    horse_result_dtype,
+    serialize_to_base64,
+)
+
+# 与 src/main/handle/Server.ts 一致
+PORT = 4639
+ENDPOINT = "/notify/response"
+BODY_LIMIT = 50 * 1024 * 1024
+PAYLOAD_SUFFIX = ".msgpack"
+PERCENTILES = (50, 90, 95, 99)
+
+
+def packb(obj) -> bytes:
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _map_key(key):
+    # 与 Server.ts 的 mapKeyConverter 一致：null 为 "__null__"，字符串和数字原样保留，
+    # 其余按 JS 的 String(key) 转换（Uint8Array / 数组为逗号连接的元素）
+    if key is None:
+        return "__null__"
+    if isinstance(key, bool):
+        return "true" if key else "false"
+    if isinstance(key, (str, int, float)):
+        return key
+    if isinstance(key, (bytes, tuple)):
+        return ",".join(str(v) for v in key)
+    return str(key)
+
+
+def unpackb(data: bytes):
+    return msgpack.unpackb(
+        data,
+        raw=False,
+        strict_map_key=False,
+        object_pairs_hook=lambda pairs: {_map_key(k): v for k, v in pairs},
+    )
+
+
+def synthesize_scenario(
+    rng: np.random.Generator,
+    horse_num: int = 18,
+    frame_count: int = 300,
+    event_count: int = 60,
+    distance: int = 2000,
+) -> RaceScenario:
+    s = RaceScenario()
+    s.header_max_length = 4
+    s.header_version = 100000002
+    s.distance_diff_max = float(rng.uniform(5, 30))
+    s.horse_num = horse_num
+    s.horse_frame_size = 12
+    s.horse_result_size = 31
+    s.frame_count = frame_count
+    s.frame_size = 4 + horse_num * s.horse_frame_size
+
+    frames = np.zeros(frame_count, dtype=frame_dtype(horse_num, 12, s.frame_size))
+    frames["time"] = np.arange(frame_count, dtype=np.float32)
+    speed = rng.uniform(15, 20, size=(frame_count, horse_num))
+    horse = frames["horse"]
+    horse["distance"] = np.minimum(np.cumsum(speed, axis=0), distance)
+    horse["speed"] = speed * 100
+    horse["lane_position"] = rng.integers(0, 1500, size=(frame_count, horse_num))
+    horse["hp"] = np.linspace(2000, 0, frame_count)[:, None]
+    horse["block_front_horse_index"] = -1
+    s.frames = frames
+
+    results = np.zeros(horse_num, dtype=horse_result_dtype(31))
+    finish_time = np.sort(rng.uniform(110, 130, size=horse_num))
+    order = rng.permutation(horse_num)
+    results["finish_order"][order] = np.arange(horse_num)
+    results["finish_time"][order] = finish_time
+    results["finish_time_raw"][order] = finish_time
+    results["finish_diff_time"][order] = finish_time - finish_time[0]
+    results["running_style"] = rng.integers(1, 5, size=horse_num)
+    s.horse_results = results
+
+    events = np.zeros(event_count, dtype=EVENT_DTYPE)
+    events["frame_time"] = np.sort(rng.uniform(0, frame_count, size=event_count))
+    events["type"] = rng.choice([1, 2, 4], size=event_count)
+    events["param_count"] = 3
+    s.events = events
+    s.event_sizes = np.full(event_count, 6 + 4 * 3, dtype=np.int16)
+    # 参数依次为 马番(0 起)、skill id、等级
+    params = np.stack(
+        [
+            rng.integers(0, horse_num, size=event_count),
+            rng.integers(200000, 210000, size=event_count),
+            np.ones(event_count, dtype=np.int64),
+        ],
+        axis=1,
+    )
+    s.event_params = params.astype("<i4").ravel()
+    s.event_param_offsets = np.arange(0, 3 * event_count + 1, 3)
+    return s
+
+
+def synthesize_horse(rng: random.Random, frame_order: int) -> dict:
+    # 字段取自 src/umdb/TrainedCharaData.ts 的 fromRaceHorseData
+    horse = {
+        "viewer_id": rng.randrange(100000000, 999999999),
+        "trainer_name": f"trainer{frame_order}",
+        "trained_chara_id": rng.randrange(1, 1000),
+        "chara_id": rng.randrange(1001, 1100),
+        "card_id": rng.randrange(100101, 109901),
+        "frame_order": frame_order,
+        "popularity": frame_order,
+        "popularity_mark_rank_array": [rng.randrange(1, 4) for _ in range(3)],
+        "motivation": rng.randrange(1, 6),
+        "running_style": rng.randrange(1, 5),
+        "rank_score": rng.randrange(5000, 20000),
+        "skill_array": [
+            {"skill_id": rng.randrange(200000, 210000), "level": rng.randrange(1, 6)}
+            for _ in range(rng.randrange(5, 20))
+        ],
+    }
+    for key in ("speed", "stamina", "pow", "guts", "wiz"):
+        horse[key] = rng.randrange(300, 1600)
+    for key in (
+        "proper_distance_short",
+        "proper_distance_mile",
+        "proper_distance_middle",
+        "proper_distance_long",
+        "proper_running_style_nige",
+        "proper_running_style_senko",
+        "proper_running_style_sashi",
+        "proper_running_style_oikomi",
+        "proper_ground_turf",
+        "proper_ground_dirt",
+    ):
+        horse[key] = rng.randrange(1, 9)
+    return horse
+
+
+def synthesize_payload(
+    seed: int, horse_num: int = 18, frame_count: int = 300, event_count: int = 60
+) -> dict:
+    # 形如比赛开始的响应：data 下同时有 race_scenario 与 race_horse_data_array，
+    # 元信息直接位于 data 中（handleRaceInfo 的最后一个回退分支）
+    rng = random.Random(seed)
+    scenario = synthesize_scenario(
+        np.random.default_rng(seed), horse_num, frame_count, event_count
+    )
+    return {
+        "data_headers": {
+            "viewer_id": rng.randrange(100000000, 999999999),
+            "sid": f"{rng.getrandbits(128):032x}",
+            "servertime": int(time.time()),
+            "result_code": 1,
+        },
+        "data": {
+            "race_scenario": serialize_to_base64(scenario),
+            "race_horse_data_array": [
+                synthesize_horse(rng, i + 1) for i in range(horse_num)
+            ],
+            "race_instance_id": rng.randrange(100000, 999999),
+            "season": rng.randrange(1, 5),
+            "weather": rng.randrange(1, 5),
+            "ground_condition": rng.randrange(1, 5),
+            "random_seed": rng.getrandbits(31),
+            "entry_num": horse_num,
+            "current_entry_num": horse_num,
+        },
+    }
+
+
+def load_payloads(path: str) -> list:
+    paths = (
+        sorted(glob.glob(os.path.join(path, "*" + PAYLOAD_SUFFIX)))
+        if os.path.isdir(path)
+        else [path]
+    )
+    payloads = []
+    for p in paths:
+        with open(p, "rb") as f:
+            payloads.append(f.read())
+    return payloads
+
+
+def save_payload(directory: str, seq: int, body: bytes) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{seq:06d}_{int(time.time())}{PAYLOAD_SUFFIX}")
+    with open(path, "wb") as f:
+        f.write(body)
+    return path
+
+
+def _hex_bytes(value):
+    # 对应 src/main/util.ts 的 jsonReplacer
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def handle_race_info(decoded, race_dir: str) -> str | None:
+    # 按 src/main/handle/RaceInfo.ts 的 handleRaceInfo 同步写出 race_info_<ts>.json
+    if not isinstance(decoded, dict):
+        return None
+    data = decoded.get("data") or decoded
+    if not isinstance(data, dict):
+        return None
+
+    def pick(key):
+        for parent in (data, data.get("race_result_info"), data.get("result_info")):
+            if isinstance(parent, dict) and parent.get(key) is not None:
+                return parent[key]
+        return None
+
+    scenario = pick("race_scenario")
+    horses = pick("race_horse_data_array")
+    meta = data.get("race_result") or data.get("race_result_info") or data
+    if not scenario or not horses or not isinstance(meta, dict):
+        return None
+    if meta.get("random_seed") is None:
+        return None
+    filename = f"race_info_{int(time.time())}.json"
+    path = os.path.join(race_dir, filename)
+    record = {
+        "filename": filename,
+        "fullPath": path,
+        "createdAt": meta.get("start_time") or time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "raceMetaInfo": {
+            "race_instance_id": meta.get("race_instance_id"),
+            "season": meta.get("season", -1),
+            "weather": meta.get("weather", -1),
+            "ground_condition": meta.get("ground_condition", -1),
+            "random_seed": meta.get("random_seed", -1),
+            "entry_num": meta.get("entry_num", -1),
+            "current_entry_num": meta.get("current_entry_num", -1),
+        },
+        "scenario": scenario,
+        "horses": horses,
+    }
+    os.makedirs(race_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2, default=_hex_bytes)
+    return path
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # 本地替身：解码 msgpack，可选地录制、转发并像 handleRaceInfo 一样落盘
+    protocol_version = "HTTP/1.1"
+    server_version = "UmaShowStandIn"
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > BODY_LIMIT:
+            self.send_error(413)
+            return
+        body = self.rfile.read(length)
+        if self.path != ENDPOINT:
+            self._reply(404, {"error": "not found"})
+            return
+        with server.lock:
+            server.received += 1
+            seq = server.received
+        try:
+            if server.record_dir:
+                save_payload(server.record_dir, seq, body)
+            if server.forward:
+                _post(server.forward, body)
+            if body:
+                decoded = unpackb(body)
+                if server.race_dir:
+                    # 应用在单线程中同步写文件；同一秒内的比赛会覆盖同名文件，
+                    # 这里加锁以免多个线程交错写坏它
+                    with server.write_lock:
+                        handle_race_info(decoded, server.race_dir)
+        except Exception as e:
+            # 与 Server.ts 相同：出错只记日志，仍返回 ok
+            with server.lock:
+                server.failed += 1
+            self.log_error("%s", e)
+        self._reply(200, {"status": "ok"})
+
+    def _reply(self, code: int, obj: dict):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = PORT,
+    race_dir: str | None = None,
+    record_dir: str | None = None,
+    forward: str | None = None,
+    quiet: bool = False,
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.write_lock = threading.Lock()
+    server.received = 0
+    server.failed = 0
+    server.race_dir = race_dir
+    server.record_dir = record_dir
+    server.forward = forward
+    server.quiet = quiet
+    return server
+
+
+_HEADERS = {"Content-Type": "application/x-msgpack"}
+
+
+def _post(url: str, body: bytes, timeout: float = 30.0) -> int:
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    try:
+        conn.request("POST", parts.path or ENDPOINT, body, _HEADERS)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+class Replayer:
+    # 每个线程复用一条 keep-alive 连接；rate 为全局目标请求速率（开环调度）
+    def __init__(self, url: str, concurrency: int, rate: float | None, timeout: float):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or ENDPOINT
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            self._local.conn = conn
+        return conn
+
+    def _send(self, i: int, body: bytes, start: float):
+        # 返回 (相对计划发送时间的滞后, 延迟, 字节数, 错误)
+        scheduled = start + i / self.rate if self.rate else start
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request("POST", self.path, body, _HEADERS)
+            response = conn.getresponse()
+            response.read()
+            error = None if response.status == 200 else f"HTTP {response.status}"
+        except (OSError, http.client.HTTPException) as e:
+            self._local.conn = None
+            error = type(e).__name__
+        lag = sent - scheduled if self.rate else 0.0
+        return lag, time.perf_counter() - sent, len(body), error
+
+    def run(self, payloads: list, requests: int) -> dict:
+        bodies = [payloads[i % len(payloads)] for i in range(requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(
+                executor.map(lambda ib: self._send(*ib, start), enumerate(bodies))
+            )
+        return summarize(results, time.perf_counter() - start)
+
+
+def summarize(results: list, elapsed: float) -> dict:
+    latencies = np.array([r[1] for r in results if r[3] is None])
+    errors = {}
+    for r in results:
+        if r[3] is not None:
+            errors[r[3]] = errors.get(r[3], 0) + 1
+    ok = len(latencies)
+    sent = sum(r[2] for r in results if r[3] is None)
+    report = {
+        "requests": len(results),
+        "ok": ok,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": ok / elapsed if elapsed else 0.0,
+        "bytes_sent": sent,
+        "mbytes_per_second": sent / elapsed / 1e6 if elapsed else 0.0,
+        # 并发不足以维持 --rate 时，请求会晚于计划发出
+        "max_schedule_lag_ms": max((r[0] for r in results), default=0.0) * 1000,
+        "latency_ms": {},
+    }
+    if ok:
+        report["latency_ms"] = {
+            "min": float(latencies.min() * 1000),
+            "mean": float(latencies.mean() * 1000),
+            **{f"p{p}": float(np.percentile(latencies, p) * 1000) for p in PERCENTILES},
+            "max": float(latencies.max() * 1000),
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(
+        f"{report['ok']}/{report['requests']} ok in {report['elapsed']:.2f}s, "
+        f"{report['throughput']:.1f} req/s, {report['mbytes_per_second']:.2f} MB/s"
+    )
+    if report["latency_ms"]:
+        print(
+            "latency ms: "
+            + ", ".join(f"{k} {v:.2f}" for k, v in report["latency_ms"].items())
+        )
+    if report["max_schedule_lag_ms"] > 1:
+        print(f"max schedule lag {report['max_schedule_lag_ms']:.2f} ms")
+    for error, count in report["errors"].items():
+        print(f"error {error}: {count}")
+
+
+def _synth_args(parser):
+    parser.add_argument("--horse_num", type=int, default=18)
+    parser.add_argument("--frame_count", type=int, default=300)
+    parser.add_argument("--event_count", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _synthesized(args, count: int) -> list:
+    return [
+        packb(
+            synthesize_payload(
+                args.seed + i, args.horse_num, args.frame_count, args.event_count
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record, synthesize and replay /notify/response msgpack payloads"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="run the local stand-in server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=PORT)
+    p.add_argument("--race_dir", help="write race_info_<ts>.json like the app")
+    p.add_argument("--record_dir", help="save every received body here")
+    p.add_argument("--forward", help="also POST every body to this URL")
+    p.add_argument("--quiet", action="store_true")
+
+    p = sub.add_parser("synth", help="write synthesized race payloads")
+    p.add_argument("output_dir")
+    p.add_argument("--count", type=int, default=10)
+    _synth_args(p)
+
+    p = sub.add_parser("replay", help="replay payloads and report latency")
+    p.add_argument(
+        "payloads", nargs="?", help="a payload file or a directory of *.msgpack"
+    )
+    p.add_argument("--url", default=f"http://127.0.0.1:{PORT}{ENDPOINT}")
+    p.add_argument("--requests", type=int, default=100)
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--rate", type=float, help="target requests per second")
+    p.add_argument("--timeout", type=float, default=30.0)
+    p.add_argument(
+        "--synthesize",
+        type=int,
+        default=0,
+        help="use this many synthesized payloads instead of files",
+    )
+    _synth_args(p)
+    p.add_argument(
+        "--local",
+        action="store_true",
+        help="start the stand-in server on a free port and replay against it",
+    )
+    p.add_argument("--race_dir", help="with --local, let the stand-in write races")
+    p.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = make_server(
+            args.host,
+            args.port,
+            args.race_dir,
+            args.record_dir,
+            args.forward,
+            args.quiet,
+        )
+        print(f"Stand-in listening on {args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"Received {server.received} bodies, {server.failed} failed")
+        return
+
+    if args.command == "synth":
+        for i, body in enumerate(_synthesized(args, args.count)):
+            save_payload(args.output_dir, i + 1, body)
+        print(f"Wrote {args.count} payloads to {args.output_dir}")
+        return
+
+    if args.synthesize:
+        payloads = _synthesized(args, args.synthesize)
+    elif args.payloads:
+        payloads = load_payloads(args.payloads)
+    else:
+        parser.error("replay needs payloads or --synthesize")
+    if not payloads:
+        parser.error(f"no {PAYLOAD_SUFFIX} payloads found")
+
+    server = None
+    url = args.url
+    if args.local:
+        server = make_server(port=0, race_dir=args.race_dir, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}{ENDPOINT}"
+    try:
+        replayer = Replayer(url, args.concurrency, args.rate, args.timeout)
+        report = replayer.run(payloads, args.requests)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    report["meta"] = {
+        "url": url,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "payloads": len(payloads),
+    }
+    if server is not None:
+        report["meta"]["server_failed"] = server.failed
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
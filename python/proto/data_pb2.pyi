@@ -8,7 +8,7 @@ from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
 DESCRIPTOR: _descriptor.FileDescriptor
 
 class UMDatabase(_message.Message):
-    __slots__ = ("version", "chara", "card", "support_card", "succession_relation", "race_instance", "wins_saddle", "special_case_race", "skill", "team_stadium_score_bonus", "story", "live_song")
+    __slots__ = ("version", "chara", "card", "support_card", "succession_relation", "race_instance", "wins_saddle", "special_case_race", "skill", "team_stadium_score_bonus", "story", "live_song", "index")
     VERSION_FIELD_NUMBER: _ClassVar[int]
     CHARA_FIELD_NUMBER: _ClassVar[int]
     CARD_FIELD_NUMBER: _ClassVar[int]
@@ -21,6 +21,7 @@ class UMDatabase(_message.Message):
     TEAM_STADIUM_SCORE_BONUS_FIELD_NUMBER: _ClassVar[int]
     STORY_FIELD_NUMBER: _ClassVar[int]
     LIVE_SONG_FIELD_NUMBER: _ClassVar[int]
+    INDEX_FIELD_NUMBER: _ClassVar[int]
     version: str
     chara: _containers.RepeatedCompositeFieldContainer[Chara]
     card: _containers.RepeatedCompositeFieldContainer[Card]
@@ -33,7 +34,52 @@ class UMDatabase(_message.Message):
     team_stadium_score_bonus: _containers.RepeatedCompositeFieldContainer[TeamStadiumScoreBonus]
     story: _containers.RepeatedCompositeFieldContainer[Story]
     live_song: _containers.RepeatedCompositeFieldContainer[LiveSong]
-    def __init__(self, version: _Optional[str] = ..., chara: _Optional[_Iterable[_Union[Chara, _Mapping]]] = ..., card: _Optional[_Iterable[_Union[Card, _Mapping]]] = ..., support_card: _Optional[_Iterable[_Union[SupportCard, _Mapping]]] = ..., succession_relation: _Optional[_Iterable[_Union[SuccessionRelation, _Mapping]]] = ..., race_instance: _Optional[_Iterable[_Union[RaceInstance, _Mapping]]] = ..., wins_saddle: _Optional[_Iterable[_Union[WinsSaddle, _Mapping]]] = ..., special_case_race: _Optional[_Iterable[_Union[SpecialCaseRace, _Mapping]]] = ..., skill: _Optional[_Iterable[_Union[Skill, _Mapping]]] = ..., team_stadium_score_bonus: _Optional[_Iterable[_Union[TeamStadiumScoreBonus, _Mapping]]] = ..., story: _Optional[_Iterable[_Union[Story, _Mapping]]] = ..., live_song: _Optional[_Iterable[_Union[LiveSong, _Mapping]]] = ...) -> None: ...
+    index: UMDatabaseIndex
+    def __init__(self, version: _Optional[str] = ..., chara: _Optional[_Iterable[_Union[Chara, _Mapping]]] = ..., card: _Optional[_Iterable[_Union[Card, _Mapping]]] = ..., support_card: _Optional[_Iterable[_Union[SupportCard, _Mapping]]] = ..., succession_relation: _Optional[_Iterable[_Union[SuccessionRelation, _Mapping]]] = ..., race_instance: _Optional[_Iterable[_Union[RaceInstance, _Mapping]]] = ..., wins_saddle: _Optional[_Iterable[_Union[WinsSaddle, _Mapping]]] = ..., special_case_race: _Optional[_Iterable[_Union[SpecialCaseRace, _Mapping]]] = ..., skill: _Optional[_Iterable[_Union[Skill, _Mapping]]] = ..., team_stadium_score_bonus: _Optional[_Iterable[_Union[TeamStadiumScoreBonus, _Mapping]]] = ..., story: _Optional[_Iterable[_Union[Story, _Mapping]]] = ..., live_song: _Optional[_Iterable[_Union[LiveSong, _Mapping]]] = ..., index: _Optional[_Union[UMDatabaseIndex, _Mapping]] = ...) -> None: ...
+
+class UMDatabaseIndex(_message.Message):
+    __slots__ = ("version", "chara", "card", "support_card", "race_instance", "skill", "live_song", "skill_tag", "skill_tag_bitset", "live_perf_type", "live_perf_value", "live_square_type", "live_master_bonus_id")
+    class IdIndex(_message.Message):
+        __slots__ = ("id", "position")
+        ID_FIELD_NUMBER: _ClassVar[int]
+        POSITION_FIELD_NUMBER: _ClassVar[int]
+        id: _containers.RepeatedScalarFieldContainer[int]
+        position: _containers.RepeatedScalarFieldContainer[int]
+        def __init__(self, id: _Optional[_Iterable[int]] = ..., position: _Optional[_Iterable[int]] = ...) -> None: ...
+    class SkillTagPostings(_message.Message):
+        __slots__ = ("tag", "skill_id")
+        TAG_FIELD_NUMBER: _ClassVar[int]
+        SKILL_ID_FIELD_NUMBER: _ClassVar[int]
+        tag: int
+        skill_id: _containers.RepeatedScalarFieldContainer[int]
+        def __init__(self, tag: _Optional[int] = ..., skill_id: _Optional[_Iterable[int]] = ...) -> None: ...
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    CHARA_FIELD_NUMBER: _ClassVar[int]
+    CARD_FIELD_NUMBER: _ClassVar[int]
+    SUPPORT_CARD_FIELD_NUMBER: _ClassVar[int]
+    RACE_INSTANCE_FIELD_NUMBER: _ClassVar[int]
+    SKILL_FIELD_NUMBER: _ClassVar[int]
+    LIVE_SONG_FIELD_NUMBER: _ClassVar[int]
+    SKILL_TAG_FIELD_NUMBER: _ClassVar[int]
+    SKILL_TAG_BITSET_FIELD_NUMBER: _ClassVar[int]
+    LIVE_PERF_TYPE_FIELD_NUMBER: _ClassVar[int]
+    LIVE_PERF_VALUE_FIELD_NUMBER: _ClassVar[int]
+    LIVE_SQUARE_TYPE_FIELD_NUMBER: _ClassVar[int]
+    LIVE_MASTER_BONUS_ID_FIELD_NUMBER: _ClassVar[int]
+    version: str
+    chara: UMDatabaseIndex.IdIndex
+    card: UMDatabaseIndex.IdIndex
+    support_card: UMDatabaseIndex.IdIndex
+    race_instance: UMDatabaseIndex.IdIndex
+    skill: UMDatabaseIndex.IdIndex
+    live_song: UMDatabaseIndex.IdIndex
+    skill_tag: _containers.RepeatedCompositeFieldContainer[UMDatabaseIndex.SkillTagPostings]
+    skill_tag_bitset: bytes
+    live_perf_type: _containers.RepeatedScalarFieldContainer[int]
+    live_perf_value: _containers.RepeatedScalarFieldContainer[int]
+    live_square_type: _containers.RepeatedScalarFieldContainer[int]
+    live_master_bonus_id: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, version: _Optional[str] = ..., chara: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., card: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., support_card: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., race_instance: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., skill: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., live_song: _Optional[_Union[UMDatabaseIndex.IdIndex, _Mapping]] = ..., skill_tag: _Optional[_Iterable[_Union[UMDatabaseIndex.SkillTagPostings, _Mapping]]] = ..., skill_tag_bitset: _Optional[bytes] = ..., live_perf_type: _Optional[_Iterable[int]] = ..., live_perf_value: _Optional[_Iterable[int]] = ..., live_square_type: _Optional[_Iterable[int]] = ..., live_master_bonus_id: _Optional[_Iterable[int]] = ...) -> None: ...
 
 class Chara(_message.Message):
     __slots__ = ("id", "name", "cast_name", "icon_url")
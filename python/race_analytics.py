@@ -0,0 +1,291 @@
+import argparse
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import proto.data_pb2 as data_pb2
+import proto.game_data_pb2 as game_data_pb2
+from race_archive import ARCHIVE_FILENAME, INDEX_FILENAME, RaceArchive
+from race_scenario import deserialize_from_base64
+from umdb_container import SectionedUMDB
+
+# 终盘（最终弯道附近）从赛程 2/3 处开始；帧数据中没有弯道位置，以此近似
+FINAL_LEG_RATIO = 2 / 3
+SCHEMA_FILENAME = "schema.json"
+SUMMARY_FILENAME = "summary.json"
+RACES_FILENAME = "races.json"
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# 每匹马一行
+COLUMNS = {
+    "race_id": "<i4",
+    "race_instance_id": "<i4",
+    "distance": "<i4",
+    "season": "i1",
+    "weather": "i1",
+    "ground_condition": "i1",
+    "horse_index": "i1",
+    "finish_order": "<i2",
+    "finish_time": "<f4",
+    "last_spurt_start_distance": "<f4",
+    "running_style": "i1",
+    "final_corner_hp": "<i4",
+}
+
+
+def load_race_distances(umdb_path: str | None) -> dict:
+    if not umdb_path:
+        return {}
+    if umdb_path.endswith(".gz"):
+        with open(umdb_path, "rb") as f:
+            pb = data_pb2.UMDatabase.FromString(gzip.decompress(f.read()))
+    else:
+        with SectionedUMDB(umdb_path) as container:
+            pb = container.load(["race_instance"])
+    return {r.id: r.distance for r in pb.race_instance}
+
+
+def analyze_race(meta: dict, scenario: str, race_distances: dict) -> dict:
+    s = deserialize_from_base64(scenario)
+    horse_num = s.horse_num
+    results = s.horse_results
+    distances = s.horse_frames["distance"]
+    race_instance_id = int(meta.get("race_instance_id") or 0)
+    race_distance = race_distances.get(race_instance_id)
+    if not race_distance:
+        # 不在 UMDB 中时，用本场跑得最远的距离近似赛程
+        race_distance = float(distances.max()) if distances.size else 0.0
+
+    hp = np.full(horse_num, -1, dtype=np.int32)
+    if s.frame_count:
+        reached = distances >= race_distance * FINAL_LEG_RATIO
+        first = reached.argmax(axis=0)
+        valid = reached.any(axis=0)
+        hp[valid] = s.horse_frames["hp"][first[valid], np.arange(horse_num)[valid]]
+
+    return {
+        "race_instance_id": np.full(horse_num, race_instance_id),
+        "distance": np.full(horse_num, int(race_distance)),
+        "season": np.full(horse_num, meta.get("season", -1)),
+        "weather": np.full(horse_num, meta.get("weather", -1)),
+        "ground_condition": np.full(horse_num, meta.get("ground_condition", -1)),
+        "horse_index": np.arange(horse_num),
+        "finish_order": results["finish_order"],
+        "finish_time": results["finish_time"],
+        "last_spurt_start_distance": results["last_spurt_start_distance"],
+        "running_style": results["running_style"],
+        "final_corner_hp": hp,
+    }
+
+
+_race_distances = None
+
+
+def _init_worker(race_distances: dict):
+    global _race_distances
+    _race_distances = race_distances
+
+
+def _load_json_race(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    return obj.get("raceMetaInfo") or {}, obj.get("scenario")
+
+
+def _load_archived_race(f, offset: int, length: int):
+    f.seek(offset)
+    record = game_data_pb2.RaceRecord.FromString(f.read(length))
+    meta = record.race_meta_info
+    return {
+        "race_instance_id": meta.race_instance_id,
+        "season": meta.season,
+        "weather": meta.weather,
+        "ground_condition": meta.ground_condition,
+    }, record.scenario
+
+
+def analyze_chunk(chunk) -> tuple[dict, list]:
+    # chunk 为 [(race_id, json_path)] 或 (archive_path, [(race_id, offset, length)])
+    archive = None
+    if isinstance(chunk, tuple):
+        archive_path, chunk = chunk
+        archive = open(archive_path, "rb")
+    parts = {name: [] for name in COLUMNS}
+    errors = []
+    try:
+        for item in chunk:
+            race_id = item[0]
+            try:
+                if archive is not None:
+                    meta, scenario = _load_archived_race(archive, *item[1:])
+                else:
+                    meta, scenario = _load_json_race(item[1])
+                row = analyze_race(meta, scenario, _race_distances)
+            except Exception as e:
+                errors.append(f"race {race_id}: {e}")
+                continue
+            row["race_id"] = np.full(len(row["horse_index"]), race_id)
+            for name, dtype in COLUMNS.items():
+                parts[name].append(np.asarray(row[name], dtype=dtype))
+    finally:
+        if archive is not None:
+            archive.close()
+    columns = {}
+    for name, arrays in parts.items():
+        if arrays:
+            columns[name] = np.concatenate(arrays)
+        else:
+            columns[name] = np.empty(0, dtype=COLUMNS[name])
+    return columns, errors
+
+
+def list_sources(race_dir: str, chunk_size: int):
+    # 返回 (race 名称列表, chunk 列表)；race_id 即名称列表的下标
+    archive_path = os.path.join(race_dir, ARCHIVE_FILENAME)
+    if os.path.exists(archive_path) and os.path.exists(
+        os.path.join(race_dir, INDEX_FILENAME)
+    ):
+        with RaceArchive(race_dir) as archive:
+            rows = sorted(archive.query(), key=lambda r: r["offset"])
+        names = [r["filename"] for r in rows]
+        items = [(i, r["offset"], r["length"]) for i, r in enumerate(rows)]
+        chunks = [
+            (archive_path, items[i : i + chunk_size])
+            for i in range(0, len(items), chunk_size)
+        ]
+        return names, chunks
+
+    names = sorted(f for f in os.listdir(race_dir) if f.endswith(".json"))
+    items = [(i, os.path.join(race_dir, f)) for i, f in enumerate(names)]
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    return names, chunks
+
+
+class ColumnWriter:
+    # 每列一个裸二进制文件，逐 chunk 追加；schema.json 记录 dtype 与行数
+    def __init__(self, out_dir: str):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.rows = 0
+        self.files = {
+            name: open(os.path.join(out_dir, f"{name}.bin"), "wb")
+            for name in COLUMNS
+        }
+
+    def write(self, columns: dict):
+        for name, f in self.files.items():
+            data = np.ascontiguousarray(columns[name], dtype=COLUMNS[name])
+            f.write(data.tobytes())
+        self.rows += len(columns["race_id"])
+
+    def close(self, race_names: list):
+        for f in self.files.values():
+            f.close()
+        # race_id 列是 races.json 中的下标
+        path = os.path.join(self.out_dir, RACES_FILENAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(race_names, f, ensure_ascii=False)
+        path = os.path.join(self.out_dir, SCHEMA_FILENAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"rows": self.rows, "columns": COLUMNS}, f, indent=2)
+
+
+def load_columns(out_dir: str) -> dict:
+    with open(os.path.join(out_dir, SCHEMA_FILENAME), "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    columns = {}
+    rows = schema["rows"]
+    for name, dtype in schema["columns"].items():
+        path = os.path.join(out_dir, f"{name}.bin")
+        if rows:
+            columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    return columns
+
+
+def _describe(values: np.ndarray) -> dict:
+    values = values[np.isfinite(values)] if values.dtype.kind == "f" else values
+    if not len(values):
+        return {"count": 0}
+    q = np.quantile(values, QUANTILES)
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        **{f"p{int(p * 100)}": float(v) for p, v in zip(QUANTILES, q)},
+    }
+
+
+def summarize(columns: dict) -> dict:
+    # finish_order 从 0 起（第 1 名为 0），与 RaceDataPresenter 中 +1 显示一致
+    finished = np.asarray(columns["finish_order"]) >= 0
+    summary = {"finish_time": {}, "final_corner_hp": {}}
+    race_instance_id = np.asarray(columns["race_instance_id"])
+    for rid in np.unique(race_instance_id):
+        mask = (race_instance_id == rid) & finished
+        summary["finish_time"][str(rid)] = _describe(
+            np.asarray(columns["finish_time"])[mask]
+        )
+    spurt = np.asarray(columns["last_spurt_start_distance"])
+    summary["last_spurt_start_distance"] = _describe(spurt[spurt > 0])
+    running_style = np.asarray(columns["running_style"])
+    hp = np.asarray(columns["final_corner_hp"])
+    for style in np.unique(running_style):
+        mask = (running_style == style) & (hp >= 0)
+        summary["final_corner_hp"][str(style)] = _describe(hp[mask])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aggregate statistics over saved races"
+    )
+    parser.add_argument(
+        "race_dir",
+        help="directory of race_info_*.json files or a race_archive.py archive",
+    )
+    parser.add_argument("--out_dir", default="race_stats")
+    parser.add_argument(
+        "--umdb",
+        default="assets/data/umdb.binarypb.gz",
+        help="umdb.binarypb.gz or umdb.sections used for race distances",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk_size", type=int, default=64)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.umdb):
+        print(f"{args.umdb} not found, race distances are estimated from frames.")
+    race_distances = load_race_distances(
+        args.umdb if os.path.exists(args.umdb) else None
+    )
+    names, chunks = list_sources(args.race_dir, args.chunk_size)
+    writer = ColumnWriter(args.out_dir)
+    error_count = 0
+    with ProcessPoolExecutor(
+        max_workers=max(1, args.jobs),
+        initializer=_init_worker,
+        initargs=(race_distances,),
+    ) as executor:
+        # map 保持 chunk 顺序，输出与并发度无关
+        for columns, errors in executor.map(analyze_chunk, chunks):
+            writer.write(columns)
+            for e in errors:
+                print(f"Skipped: {e}")
+            error_count += len(errors)
+    writer.close(names)
+
+    summary = summarize(load_columns(args.out_dir))
+    path = os.path.join(args.out_dir, SUMMARY_FILENAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"Analyzed {len(names) - error_count} races, {writer.rows} horse rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from urllib.request import pathname2url
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from google.protobuf import json_format
+
+import proto.game_data_pb2 as game_data_pb2
+from umdb_container import encode_varint
+
+ARCHIVE_FILENAME = "races.umra"
+INDEX_FILENAME = "races.sqlite"
+LOCK_FILENAME = "races.lock"
+META_FIELDS = (
+    "race_instance_id",
+    "season",
+    "weather",
+    "ground_condition",
+    "random_seed",
+    "entry_num",
+    "current_entry_num",
+)
+QUERY_FIELDS = ("race_instance_id", "season", "weather", "ground_condition")
+INDEX_COLUMNS = ("filename",) + QUERY_FIELDS + ("created_at", "offset", "length")
+
+
+def record_from_json(obj: dict) -> game_data_pb2.RaceRecord:
+    # 对应 src/main/handle/RaceInfo.ts 中 handleRaceInfo 写出的 race_info_<ts>.json
+    record = game_data_pb2.RaceRecord()
+    record.filename = obj.get("filename") or ""
+    record.full_path = obj.get("fullPath") or ""
+    if obj.get("createdAt") is not None:
+        record.created_at = str(obj["createdAt"])
+    meta = obj.get("raceMetaInfo") or {}
+    for key, value in meta.items():
+        if key in META_FIELDS and isinstance(value, int):
+            setattr(record.race_meta_info, key, value)
+        elif value is not None:
+            json_format.ParseDict(value, record.race_meta_info.extra[key])
+    record.scenario = obj.get("scenario") or ""
+    for horse in obj.get("horses") or []:
+        record.horses.add().payload.update(horse)
+    return record
+
+
+def _restore_ints(value):
+    # google.protobuf.Struct 只有 double，整数在取回时还原为 int
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _restore_ints(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_ints(v) for v in value]
+    return value
+
+
+def record_to_json(record: game_data_pb2.RaceRecord) -> dict:
+    meta = {key: getattr(record.race_meta_info, key) for key in META_FIELDS}
+    for key, value in record.race_meta_info.extra.items():
+        meta[key] = _restore_ints(json_format.MessageToDict(value))
+    return {
+        "filename": record.filename,
+        "fullPath": record.full_path,
+        "createdAt": record.created_at,
+        "raceMetaInfo": meta,
+        "scenario": record.scenario,
+        "horses": [
+            _restore_ints(json_format.MessageToDict(h.payload)) for h in record.horses
+        ],
+    }
+
+
+def load_record_file(path: str) -> game_data_pb2.RaceRecord:
+    with open(path, "r", encoding="utf-8") as f:
+        record = record_from_json(json.load(f))
+    if not record.filename:
+        record.filename = os.path.basename(path)
+    return record
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RaceArchive:
+    # 追加写入的 length-delimited RaceRecord 文件 + SQLite 侧索引。
+    # 只读打开时不做任何修复：索引中的行总是指向已落盘的数据，
+    # 末尾未进索引的部分可能是另一个进程正在写入的记录。
+    def __init__(self, archive_dir: str, writable: bool = False):
+        self.archive_path = os.path.join(archive_dir, ARCHIVE_FILENAME)
+        index_path = os.path.join(archive_dir, INDEX_FILENAME)
+        self._lock = None
+        if not writable:
+            if not os.path.exists(index_path):
+                raise FileNotFoundError(f"no race archive in {archive_dir}")
+            uri = "file:%s?mode=ro" % pathname2url(os.path.abspath(index_path))
+            self.index = sqlite3.connect(uri, uri=True)
+            return
+
+        os.makedirs(archive_dir, exist_ok=True)
+        # 写入方互斥，持有到 close()
+        self._lock = open(os.path.join(archive_dir, LOCK_FILENAME), "a+b")
+        _lock_file(self._lock)
+        self.index = sqlite3.connect(index_path)
+        self.index.executescript(
+            """CREATE TABLE IF NOT EXISTS races (
+                   filename TEXT PRIMARY KEY,
+                   race_instance_id INTEGER,
+                   season INTEGER,
+                   weather INTEGER,
+                   ground_condition INTEGER,
+                   created_at TEXT,
+                   offset INTEGER NOT NULL,
+                   length INTEGER NOT NULL
+               );
+               CREATE INDEX IF NOT EXISTS races_race_instance_id
+                   ON races(race_instance_id);
+               CREATE INDEX IF NOT EXISTS races_created_at ON races(created_at);"""
+        )
+        self._truncate_unindexed_tail()
+
+    def _truncate_unindexed_tail(self):
+        # 上次写入中断时，归档末尾可能残留未进索引的数据
+        (end,) = self.index.execute(
+            "SELECT COALESCE(MAX(offset + length), 0) FROM races;"
+        ).fetchone()
+        if not os.path.exists(self.archive_path):
+            return
+        if os.path.getsize(self.archive_path) > end:
+            with open(self.archive_path, "r+b") as f:
+                f.truncate(end)
+
+    def contains(self, filename: str) -> bool:
+        row = self.index.execute(
+            "SELECT 1 FROM races WHERE filename=?;", (filename,)
+        ).fetchone()
+        return row is not None
+
+    def append(self, records) -> int:
+        if self._lock is None:
+            raise ValueError("race archive was opened read-only")
+        count = 0
+        with open(self.archive_path, "ab") as f:
+            for record in records:
+                data = record.SerializeToString()
+                f.write(encode_varint(len(data)))
+                offset = f.tell()
+                f.write(data)
+                meta = record.race_meta_info
+                self.index.execute(
+                    "INSERT INTO races VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+                    (
+                        record.filename,
+                        meta.race_instance_id,
+                        meta.season,
+                        meta.weather,
+                        meta.ground_condition,
+                        record.created_at,
+                        offset,
+                        len(data),
+                    ),
+                )
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        self.index.commit()
+        return count
+
+    def query(
+        self, since=None, until=None, limit=None, filenames=None, **filters
+    ) -> list:
+        clauses, params = [], []
+        if filenames:
+            clauses.append("filename IN (%s)" % ", ".join("?" * len(filenames)))
+            params.extend(filenames)
+        if since is not None:
+            clauses.append("created_at>=?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at<?")
+            params.append(until)
+        for key, value in filters.items():
+            if key not in QUERY_FIELDS:
+                raise KeyError(f"unknown filter {key}")
+            if value is not None:
+                clauses.append(f"{key}=?")
+                params.append(value)
+        sql = "SELECT %s FROM races" % ", ".join(INDEX_COLUMNS)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at, filename"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self.index.execute(sql, params)
+        return [dict(zip(INDEX_COLUMNS, row)) for row in rows]
+
+    def read(self, rows):
+        # 按 offset 顺序 seek 读取，只解码所需记录
+        with open(self.archive_path, "rb") as f:
+            for row in sorted(rows, key=lambda r: r["offset"]):
+                f.seek(row["offset"])
+                yield game_data_pb2.RaceRecord.FromString(f.read(row["length"]))
+
+    def close(self):
+        self.index.close()
+        if self._lock is not None:
+            _unlock_file(self._lock)
+            self._lock.close()
+            self._lock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compact(race_dir: str, archive: RaceArchive, batch_size: int = 500) -> int:
+    filenames = sorted(
+        f
+        for f in os.listdir(race_dir)
+        if f.endswith(".json") and not archive.contains(f)
+    )
+    total = 0
+    for start in range(0, len(filenames), batch_size):
+        batch = []
+        for filename in filenames[start : start + batch_size]:
+            path = os.path.join(race_dir, filename)
+            try:
+                record = load_record_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to parse {path}: {e}")
+                continue
+            # 索引以原文件名为键，保证重复运行时幂等
+            record.filename = filename
+            batch.append(record)
+        total += archive.append(batch)
+    return total
+
+
+def _add_filters(parser):
+    for key in QUERY_FIELDS:
+        parser.add_argument(f"--{key}", type=int)
+    parser.add_argument("--since", help="created_at lower bound (inclusive)")
+    parser.add_argument("--until", help="created_at upper bound (exclusive)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--filename", action="append", default=[])
+
+
+def _filters(args) -> dict:
+    return {key: getattr(args, key) for key in QUERY_FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact saved race records")
+    parser.add_argument("--archive_dir", default="race_archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compact", help="append new race_info_*.json files")
+    p.add_argument("race_dir")
+
+    p = sub.add_parser("query", help="list indexed races as JSON lines")
+    _add_filters(p)
+
+    p = sub.add_parser("extract", help="write records back as race_info JSON")
+    _add_filters(p)
+    p.add_argument("--output_dir", help="write one file per record, default stdout")
+
+    args = parser.parse_args()
+    with RaceArchive(args.archive_dir, writable=args.command == "compact") as archive:
+        if args.command == "compact":
+            count = compact(args.race_dir, archive)
+            print(f"Archived {count} races.")
+            return
+
+        rows = archive.query(
+            args.since, args.until, args.limit, args.filename, **_filters(args)
+        )
+        if args.command == "query":
+            for row in rows:
+                row.pop("offset")
+                row.pop("length")
+                print(json.dumps(row, ensure_ascii=False))
+            return
+
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        for record in archive.read(rows):
+            obj = record_to_json(record)
+            if args.output_dir:
+                path = os.path.join(args.output_dir, record.filename)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(obj, f, ensure_ascii=False, indent=2)
+            else:
+                sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
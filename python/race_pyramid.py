@@ -0,0 +1,355 @@
+import argparse
+import json
+import math
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from atomic_file import atomic_write
+from race_scenario import RaceScenario, deserialize_from_base64
+from umdb_container import (
+    SECTION_ENTRY,
+    SectionInfo,
+    compress_section,
+    decompress_section,
+)
+
+# 文件布局（小端）：
+#   MAGIC | u32 header_size | header | section data ...
+# header：
+#   u32 frame_count | u16 horse_num | u16 factor | u32 min_buckets |
+#   f4 start_time | f4 end_time |
+#   u8 level_count | level_count * (u32 bucket_count | u32 frames_per_bucket | entry) |
+#   entry(events)
+# entry 为 umdb_container.SECTION_ENTRY（u64 offset | u64 length | u64 raw_length | u32 crc32）；
+# 每个 section 单独 zlib 压缩，按需解压某一层即可。
+# 层 section：f4 time_first[n] | f4 time_last[n] | 依 SERIES 顺序每个序列的
+#   min[n, horse] | max[n, horse] | last[n, horse]；第 0 层为原始帧，只存一份值。
+# events section：u32 count | f4 frame_time | i1 type | u32 param_offsets[count + 1] |
+#   i4 params，时间戳原样保留。
+MAGIC = b"UMRPYR02"
+PYRAMID_SUFFIX = ".pyramid"
+DEFAULT_FACTOR = 4
+# 最粗一层的桶数不超过此值
+DEFAULT_MIN_BUCKETS = 32
+
+# 图表使用的逐帧序列，与 race_scenario.HORSE_FRAME_FIELDS 的类型一致
+SERIES = (
+    ("distance", "<f4"),
+    ("speed", "<u2"),
+    ("hp", "<u2"),
+    ("lane_position", "<u2"),
+)
+
+_U32 = struct.Struct("<I")
+_HEADER = struct.Struct("<IHHIff")
+_LEVEL = struct.Struct("<II")
+
+# min / max / last 均为 {序列名: (bucket_count, horse_num) 数组}
+PyramidLevel = namedtuple(
+    "PyramidLevel",
+    ["frames_per_bucket", "time_first", "time_last", "min", "max", "last"],
+)
+
+
+def build_levels(
+    s: RaceScenario,
+    factor: int = DEFAULT_FACTOR,
+    min_buckets: int = DEFAULT_MIN_BUCKETS,
+) -> list:
+    if factor < 2:
+        raise ValueError("factor must be at least 2")
+    frames = s.horse_frames
+    time = np.ascontiguousarray(s.time, dtype="<f4")
+    values = {
+        name: np.ascontiguousarray(frames[name], dtype=dtype) for name, dtype in SERIES
+    }
+    level = PyramidLevel(1, time, time, values, values, values)
+    levels = [level]
+    # 每层由上一层聚合：min 取 min，max 取 max，last 取桶内最后一个
+    while len(level.time_first) > max(min_buckets, 1):
+        n = len(level.time_first)
+        starts = np.arange(0, n, factor)
+        ends = np.minimum(starts + factor, n) - 1
+        level = PyramidLevel(
+            level.frames_per_bucket * factor,
+            level.time_first[starts],
+            level.time_last[ends],
+            {k: np.minimum.reduceat(v, starts, axis=0) for k, v in level.min.items()},
+            {k: np.maximum.reduceat(v, starts, axis=0) for k, v in level.max.items()},
+            {k: v[ends] for k, v in level.last.items()},
+        )
+        levels.append(level)
+    return levels
+
+
+def _encode_level(level: PyramidLevel, raw: bool) -> bytes:
+    parts = [level.time_first.tobytes(), level.time_last.tobytes()]
+    for name, dtype in SERIES:
+        arrays = (level.last,) if raw else (level.min, level.max, level.last)
+        parts.extend(
+            np.ascontiguousarray(a[name], dtype=dtype).tobytes() for a in arrays
+        )
+    return b"".join(parts)
+
+
+def _encode_events(s: RaceScenario) -> bytes:
+    events = s.events
+    return b"".join(
+        [
+            _U32.pack(len(events)),
+            np.ascontiguousarray(events["frame_time"], dtype="<f4").tobytes(),
+            np.ascontiguousarray(events["type"], dtype="i1").tobytes(),
+            np.asarray(s.event_param_offsets, dtype="<u4").tobytes(),
+            np.asarray(s.event_params, dtype="<i4").tobytes(),
+        ]
+    )
+
+
+def write_pyramid(
+    path: str,
+    s: RaceScenario,
+    factor: int = DEFAULT_FACTOR,
+    min_buckets: int = DEFAULT_MIN_BUCKETS,
+):
+    levels = build_levels(s, factor, min_buckets)
+    sections = [_encode_level(level, i == 0) for i, level in enumerate(levels)]
+    sections.append(_encode_events(s))
+
+    time = levels[0].time_first
+    header_size = (
+        _HEADER.size
+        + 1
+        + len(levels) * (_LEVEL.size + SECTION_ENTRY.size)
+        + SECTION_ENTRY.size
+    )
+    header = [
+        _HEADER.pack(
+            s.frame_count,
+            s.horse_num,
+            factor,
+            min_buckets,
+            float(time[0]) if len(time) else 0.0,
+            float(time[-1]) if len(time) else 0.0,
+        ),
+        bytes([len(levels)]),
+    ]
+    payloads = []
+    offset = len(MAGIC) + _U32.size + header_size
+    for i, raw in enumerate(sections):
+        entry, compressed = compress_section(offset, raw)
+        if i < len(levels):
+            level = levels[i]
+            entry = _LEVEL.pack(len(level.time_first), level.frames_per_bucket) + entry
+        header.append(entry)
+        payloads.append(compressed)
+        offset += len(compressed)
+
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(_U32.pack(header_size))
+        for chunk in header + payloads:
+            f.write(chunk)
+
+
+class RacePyramid:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = f.read()
+        data = self._data
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a race frame pyramid")
+        pos = len(MAGIC) + _U32.size
+        (
+            self.frame_count,
+            self.horse_num,
+            self.factor,
+            self.min_buckets,
+            self.start_time,
+            self.end_time,
+        ) = _HEADER.unpack_from(data, pos)
+        pos += _HEADER.size
+        level_count = data[pos]
+        pos += 1
+        # [(bucket_count, frames_per_bucket, SectionInfo)]
+        self.level_info = []
+        for _ in range(level_count):
+            bucket_count, frames_per_bucket = _LEVEL.unpack_from(data, pos)
+            pos += _LEVEL.size
+            info = SectionInfo(*SECTION_ENTRY.unpack_from(data, pos))
+            pos += SECTION_ENTRY.size
+            self.level_info.append((bucket_count, frames_per_bucket, info))
+        self._events_info = SectionInfo(*SECTION_ENTRY.unpack_from(data, pos))
+        self._levels = {}
+        self._events = None
+
+    def _section(self, info: SectionInfo) -> bytes:
+        return decompress_section(self._data, info, "race frame pyramid")
+
+    def level(self, i: int) -> PyramidLevel:
+        if i in self._levels:
+            return self._levels[i]
+        n, frames_per_bucket, info = self.level_info[i]
+        raw = self._section(info)
+        pos = 0
+
+        def array(dtype, shape):
+            nonlocal pos
+            a = np.frombuffer(raw, dtype=dtype, count=math.prod(shape), offset=pos)
+            pos += a.nbytes
+            return a.reshape(shape)
+
+        time_first = array("<f4", (n,))
+        time_last = array("<f4", (n,))
+        mins, maxs, lasts = {}, {}, {}
+        for name, dtype in SERIES:
+            if i == 0:
+                mins[name] = maxs[name] = lasts[name] = array(
+                    dtype, (n, self.horse_num)
+                )
+            else:
+                mins[name] = array(dtype, (n, self.horse_num))
+                maxs[name] = array(dtype, (n, self.horse_num))
+                lasts[name] = array(dtype, (n, self.horse_num))
+        level = PyramidLevel(
+            frames_per_bucket, time_first, time_last, mins, maxs, lasts
+        )
+        self._levels[i] = level
+        return level
+
+    def choose_level(self, t0: float, t1: float, max_points: int) -> int:
+        # 按帧时间均匀估算窗口内的帧数，取桶数不超过 max_points 的最细一层
+        span = self.end_time - self.start_time
+        fraction = min(max(t1 - t0, 0.0) / span, 1.0) if span > 0 else 1.0
+        frames = math.ceil(self.frame_count * fraction) + 1
+        for i, (_, frames_per_bucket, _) in enumerate(self.level_info):
+            if math.ceil(frames / frames_per_bucket) + 1 <= max_points:
+                return i
+        return len(self.level_info) - 1
+
+    def window(self, t0: float, t1: float, max_points: int = 1000):
+        # 返回 (层号, 与 [t0, t1] 相交的桶组成的 PyramidLevel)
+        i = self.choose_level(t0, t1, max_points)
+        level = self.level(i)
+        start = int(np.searchsorted(level.time_last, t0, side="left"))
+        end = int(np.searchsorted(level.time_first, t1, side="right"))
+        part = slice(start, max(start, end))
+        return i, PyramidLevel(
+            level.frames_per_bucket,
+            level.time_first[part],
+            level.time_last[part],
+            {k: v[part] for k, v in level.min.items()},
+            {k: v[part] for k, v in level.max.items()},
+            {k: v[part] for k, v in level.last.items()},
+        )
+
+    @property
+    def events(self):
+        # (frame_time, type, param_offsets, params)；第 i 个事件的参数为
+        # params[param_offsets[i]:param_offsets[i + 1]]
+        if self._events is None:
+            raw = self._section(self._events_info)
+            (count,) = _U32.unpack_from(raw, 0)
+            pos = _U32.size
+            frame_time = np.frombuffer(raw, dtype="<f4", count=count, offset=pos)
+            pos += frame_time.nbytes
+            types = np.frombuffer(raw, dtype="i1", count=count, offset=pos)
+            pos += types.nbytes
+            offsets = np.frombuffer(raw, dtype="<u4", count=count + 1, offset=pos)
+            pos += offsets.nbytes
+            params = np.frombuffer(raw, dtype="<i4", offset=pos)
+            self._events = frame_time, types, offsets, params
+        return self._events
+
+
+def pyramid_path(record_path: str) -> str:
+    # race_info_<ts>.json -> race_info_<ts>.pyramid
+    return os.path.splitext(record_path)[0] + PYRAMID_SUFFIX
+
+
+def _built_with(path: str):
+    # 返回 (factor, min_buckets)；旧格式或损坏的文件返回 None 以触发重建
+    pos = len(MAGIC) + _U32.size
+    with open(path, "rb") as f:
+        head = f.read(pos + _HEADER.size)
+    if len(head) < pos + _HEADER.size or not head.startswith(MAGIC):
+        return None
+    _, _, factor, min_buckets, _, _ = _HEADER.unpack_from(head, pos)
+    return factor, min_buckets
+
+
+def build_for_record(
+    record_path: str,
+    factor: int = DEFAULT_FACTOR,
+    min_buckets: int = DEFAULT_MIN_BUCKETS,
+    force: bool = False,
+) -> str | None:
+    # 对应 src/main/handle/RaceInfo.ts 写出的 JSON；已是最新且参数相同时跳过
+    path = pyramid_path(record_path)
+    if (
+        not force
+        and os.path.exists(path)
+        and os.path.getmtime(path) >= os.path.getmtime(record_path)
+        and _built_with(path) == (factor, min_buckets)
+    ):
+        return None
+    with open(record_path, "r", encoding="utf-8") as f:
+        scenario = json.load(f).get("scenario")
+    if not scenario:
+        return None
+    write_pyramid(path, deserialize_from_base64(scenario), factor, min_buckets)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build multi-resolution frame pyramids for saved races"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="write <record>.pyramid next to each record")
+    p.add_argument("paths", nargs="+", help="race_info_*.json files or directories")
+    p.add_argument("--factor", type=int, default=DEFAULT_FACTOR)
+    p.add_argument("--min_buckets", type=int, default=DEFAULT_MIN_BUCKETS)
+    p.add_argument("--force", action="store_true", help="rebuild up-to-date files")
+
+    p = sub.add_parser("info", help="describe a pyramid file")
+    p.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        pyramid = RacePyramid(args.path)
+        print(
+            f"{pyramid.frame_count} frames x {pyramid.horse_num} horses, "
+            f"factor={pyramid.factor}, min_buckets={pyramid.min_buckets}, "
+            f"t={pyramid.start_time:g}..{pyramid.end_time:g}, "
+            f"{len(pyramid.events[0])} events"
+        )
+        for i, (n, frames_per_bucket, info) in enumerate(pyramid.level_info):
+            print(
+                f"  level {i}: {n} buckets of {frames_per_bucket} frames, "
+                f"{info.length} bytes"
+            )
+        return
+
+    records = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            records.extend(
+                os.path.join(path, f)
+                for f in sorted(os.listdir(path))
+                if f.endswith(".json")
+            )
+        else:
+            records.append(path)
+    built = 0
+    for record in records:
+        if build_for_record(record, args.factor, args.min_buckets, args.force):
+            built += 1
+    print(f"Built {built} pyramids, {len(records) - built} skipped")
+
+
+if __name__ == "__main__":
+    main()
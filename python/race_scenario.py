@@ -0,0 +1,266 @@
+import base64
+import gzip
+import struct
+import zlib
+
+import numpy as np
+
+import proto.race_data_pb2 as race_data_pb2
+
+# 与 src/umdb/RaceDataParser.ts 的二进制布局一致
+_TWO_INT32 = struct.Struct("<ii")
+_ONE_INT32 = struct.Struct("<i")
+_ONE_INT16 = struct.Struct("<h")
+_RACE = struct.Struct("<fiii")
+_EVENT = struct.Struct("<fbb")
+
+# <fHHHbb
+HORSE_FRAME_FIELDS = [
+    ("distance", "<f4", 0),
+    ("lane_position", "<u2", 4),
+    ("speed", "<u2", 6),
+    ("hp", "<u2", 8),
+    ("temptation_mode", "i1", 10),
+    ("block_front_horse_index", "i1", 11),
+]
+# <ifffBBfBif
+HORSE_RESULT_FIELDS = [
+    ("finish_order", "<i4", 0),
+    ("finish_time", "<f4", 4),
+    ("finish_diff_time", "<f4", 8),
+    ("start_delay_time", "<f4", 12),
+    ("guts_order", "u1", 16),
+    ("wiz_order", "u1", 17),
+    ("last_spurt_start_distance", "<f4", 18),
+    ("running_style", "u1", 22),
+    ("defeat", "<i4", 23),
+    ("finish_time_raw", "<f4", 27),
+]
+EVENT_DTYPE = np.dtype(
+    [("frame_time", "<f4"), ("type", "i1"), ("param_count", "i1")]
+)
+
+
+def _struct_dtype(fields, itemsize: int) -> np.dtype:
+    min_size = max(np.dtype(fmt).itemsize + off for _, fmt, off in fields)
+    if itemsize < min_size:
+        raise ValueError(f"record size {itemsize} is smaller than {min_size}")
+    return np.dtype(
+        {
+            "names": [name for name, _, _ in fields],
+            "formats": [fmt for _, fmt, _ in fields],
+            "offsets": [off for _, _, off in fields],
+            "itemsize": itemsize,
+        }
+    )
+
+
+def horse_frame_dtype(horse_frame_size: int = 12) -> np.dtype:
+    return _struct_dtype(HORSE_FRAME_FIELDS, horse_frame_size)
+
+
+def horse_result_dtype(horse_result_size: int = 31) -> np.dtype:
+    return _struct_dtype(HORSE_RESULT_FIELDS, horse_result_size)
+
+
+def frame_dtype(
+    horse_num: int, horse_frame_size: int, frame_size: int
+) -> np.dtype:
+    if frame_size < 4 + horse_num * horse_frame_size:
+        raise ValueError(
+            f"frame size {frame_size} too small for {horse_num} horses"
+        )
+    horse = horse_frame_dtype(horse_frame_size)
+    return np.dtype(
+        {
+            "names": ["time", "horse"],
+            "formats": ["<f4", (horse, (horse_num,))],
+            "offsets": [0, 4],
+            "itemsize": frame_size,
+        }
+    )
+
+
+class RaceScenario:
+    # frames / horse_results 是指向解压后数据的零拷贝只读视图
+    def __init__(self):
+        self.header_max_length = 0
+        self.header_version = 0
+        self.distance_diff_max = 0.0
+        self.horse_num = 0
+        self.horse_frame_size = 0
+        self.horse_result_size = 0
+        self.padding_size_1 = 0
+        self.frame_count = 0
+        self.frame_size = 0
+        self.padding_size_2 = 0
+        self.padding_size_3 = 0
+        self.frames = None
+        self.horse_results = None
+        self.event_sizes = None
+        self.events = None
+        # 第 i 个事件的参数为 event_params[offsets[i]:offsets[i + 1]]
+        self.event_params = None
+        self.event_param_offsets = None
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.frames["time"]
+
+    @property
+    def horse_frames(self) -> np.ndarray:
+        # 形状为 (frame_count, horse_num)
+        return self.frames["horse"]
+
+    def event_param(self, i: int) -> np.ndarray:
+        return self.event_params[
+            self.event_param_offsets[i] : self.event_param_offsets[i + 1]
+        ]
+
+    def to_proto(self) -> race_data_pb2.RaceSimulateData:
+        data = race_data_pb2.RaceSimulateData()
+        data.header.max_length = self.header_max_length
+        data.header.version = self.header_version
+        data.distance_diff_max = float(self.distance_diff_max)
+        data.horse_num = self.horse_num
+        data.horse_frame_size = self.horse_frame_size
+        data.horse_result_size = self.horse_result_size
+        setattr(data, "__padding_size_1", self.padding_size_1)
+        data.frame_count = self.frame_count
+        data.frame_size = self.frame_size
+        horse_frames = self.horse_frames
+        for f in range(self.frame_count):
+            frame = data.frame.add()
+            frame.time = float(self.frames["time"][f])
+            for h in horse_frames[f].tolist():
+                horse = frame.horse_frame.add()
+                (
+                    horse.distance,
+                    horse.lane_position,
+                    horse.speed,
+                    horse.hp,
+                    horse.temptation_mode,
+                    horse.block_front_horse_index,
+                ) = h
+        setattr(data, "__padding_size_2", self.padding_size_2)
+        for r in self.horse_results.tolist():
+            result = data.horse_result.add()
+            (
+                result.finish_order,
+                result.finish_time,
+                result.finish_diff_time,
+                result.start_delay_time,
+                result.guts_order,
+                result.wiz_order,
+                result.last_spurt_start_distance,
+                result.running_style,
+                result.defeat,
+                result.finish_time_raw,
+            ) = r
+        setattr(data, "__padding_size_3", self.padding_size_3)
+        data.event_count = len(self.events)
+        for i, e in enumerate(self.events.tolist()):
+            wrapper = data.event.add()
+            wrapper.event_size = int(self.event_sizes[i])
+            event = wrapper.event
+            event.frame_time, event.type, event.param_count = e
+            event.param.extend(self.event_param(i).tolist())
+        return data
+
+
+def deserialize(buffer: bytes) -> RaceScenario:
+    s = RaceScenario()
+    s.header_max_length, s.header_version = _TWO_INT32.unpack_from(buffer, 0)
+    offset = 4 + s.header_max_length
+
+    (
+        s.distance_diff_max,
+        s.horse_num,
+        s.horse_frame_size,
+        s.horse_result_size,
+    ) = _RACE.unpack_from(buffer, offset)
+    offset += _RACE.size
+
+    (s.padding_size_1,) = _ONE_INT32.unpack_from(buffer, offset)
+    offset += 4 + s.padding_size_1
+
+    s.frame_count, s.frame_size = _TWO_INT32.unpack_from(buffer, offset)
+    offset += _TWO_INT32.size
+    dtype = frame_dtype(s.horse_num, s.horse_frame_size, s.frame_size)
+    s.frames = np.frombuffer(buffer, dtype=dtype, count=s.frame_count, offset=offset)
+    offset += s.frame_count * s.frame_size
+
+    (s.padding_size_2,) = _ONE_INT32.unpack_from(buffer, offset)
+    offset += 4 + s.padding_size_2
+
+    s.horse_results = np.frombuffer(
+        buffer,
+        dtype=horse_result_dtype(s.horse_result_size),
+        count=s.horse_num,
+        offset=offset,
+    )
+    offset += s.horse_num * s.horse_result_size
+
+    (s.padding_size_3,) = _ONE_INT32.unpack_from(buffer, offset)
+    offset += 4 + s.padding_size_3
+
+    (event_count,) = _ONE_INT32.unpack_from(buffer, offset)
+    offset += 4
+    events = np.empty(event_count, dtype=EVENT_DTYPE)
+    event_sizes = np.empty(event_count, dtype=np.int16)
+    param_offsets = np.zeros(event_count + 1, dtype=np.int64)
+    params = []
+    for i in range(event_count):
+        (event_sizes[i],) = _ONE_INT16.unpack_from(buffer, offset)
+        offset += 2
+        frame_time, event_type, param_count = _EVENT.unpack_from(buffer, offset)
+        events[i] = (frame_time, event_type, param_count)
+        params.append(
+            np.frombuffer(
+                buffer, dtype="<i4", count=param_count, offset=offset + _EVENT.size
+            )
+        )
+        param_offsets[i + 1] = param_offsets[i] + param_count
+        offset += int(event_sizes[i])
+    s.events = events
+    s.event_sizes = event_sizes
+    s.event_params = (
+        np.concatenate(params) if params else np.empty(0, dtype="<i4")
+    )
+    s.event_param_offsets = param_offsets
+    return s
+
+
+def serialize(s: RaceScenario) -> bytes:
+    # deserialize 的逆过程；header 剩余部分与各 padding 以 0 填充
+    out = bytearray(_TWO_INT32.pack(s.header_max_length, s.header_version))
+    out += bytes(s.header_max_length - 4)
+    out += _RACE.pack(
+        s.distance_diff_max, s.horse_num, s.horse_frame_size, s.horse_result_size
+    )
+    out += _ONE_INT32.pack(s.padding_size_1) + bytes(s.padding_size_1)
+    out += _TWO_INT32.pack(s.frame_count, s.frame_size)
+    out += s.frames.tobytes()
+    out += _ONE_INT32.pack(s.padding_size_2) + bytes(s.padding_size_2)
+    out += s.horse_results.tobytes()
+    out += _ONE_INT32.pack(s.padding_size_3) + bytes(s.padding_size_3)
+    out += _ONE_INT32.pack(len(s.events))
+    for i, (frame_time, event_type, param_count) in enumerate(s.events.tolist()):
+        event = _EVENT.pack(frame_time, event_type, param_count)
+        event += s.event_param(i).astype("<i4").tobytes()
+        size = int(s.event_sizes[i])
+        out += _ONE_INT16.pack(size) + event + bytes(size - len(event))
+    return bytes(out)
+
+
+def serialize_to_base64(s: RaceScenario) -> str:
+    return base64.b64encode(gzip.compress(serialize(s), mtime=0)).decode("ascii")
+
+
+def inflate(payload: bytes) -> bytes:
+    # 自动识别 zlib / gzip 头，与 pako.inflate 行为一致
+    return zlib.decompress(payload, 47)
+
+
+def deserialize_from_base64(text: str) -> RaceScenario:
+    return deserialize(inflate(base64.b64decode(text)))
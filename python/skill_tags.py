@@ -0,0 +1,180 @@
+import argparse
+import gzip
+
+import numpy as np
+
+import proto.data_pb2 as data_pb2
+
+# enum SingleModeDefine.SkillTag，见 umdb/data.proto 中 Skill.tag_id 的注释
+NIGE = 101
+SENKO = 102
+SASHI = 103
+OIKOMI = 104
+SHORT = 201
+MILE = 202
+MIDDLE = 203
+LONG = 204
+SPEED = 401
+STAMINA = 402
+POWER = 403
+GUTS = 404
+WIZ = 405
+DOWN = 406
+SPECIAL = 407
+TURF = 501
+DIRT = 502
+
+# (begin, end) 均为开区间端点，与枚举中的 *Begin / *End 一致
+RUNNING_STYLE_RANGE = (100, 199)
+DISTANCE_RANGE = (200, 299)
+GROUND_RANGE = (500, 599)
+SCENARIO_RANGE = (800, 899)
+
+TAG_GROUPS = {
+    "running_style": RUNNING_STYLE_RANGE,
+    "distance": DISTANCE_RANGE,
+    "ground": GROUND_RANGE,
+    "scenario": SCENARIO_RANGE,
+}
+
+TAG_NAMES = {
+    "nige": NIGE,
+    "senko": SENKO,
+    "sashi": SASHI,
+    "oikomi": OIKOMI,
+    "short": SHORT,
+    "mile": MILE,
+    "middle": MIDDLE,
+    "long": LONG,
+    "speed": SPEED,
+    "stamina": STAMINA,
+    "power": POWER,
+    "guts": GUTS,
+    "wiz": WIZ,
+    "down": DOWN,
+    "special": SPECIAL,
+    "turf": TURF,
+    "dirt": DIRT,
+}
+
+
+def parse_tag(tag: str) -> int | None:
+    try:
+        return int(tag)
+    except ValueError:
+        return None
+
+
+def in_range(tag: int, tag_range: tuple[int, int]) -> bool:
+    return tag_range[0] < tag < tag_range[1]
+
+
+def build_skill_tag_index(pb: data_pb2.UMDatabase, index: data_pb2.UMDatabaseIndex):
+    # 需在 index.skill 建好之后调用；bitset 的行与 index.skill.id 对齐
+    skill_tags = []
+    for skill_id, position in zip(index.skill.id, index.skill.position):
+        tags = {parse_tag(t) for t in pb.skill[position].tag_id}
+        tags.discard(None)
+        skill_tags.append((skill_id, tags))
+
+    tag_codes = sorted({t for _, tags in skill_tags for t in tags})
+    bit_of = {t: i for i, t in enumerate(tag_codes)}
+    bits = np.zeros((len(skill_tags), len(tag_codes)), dtype=bool)
+    postings = {t: [] for t in tag_codes}
+    for row, (skill_id, tags) in enumerate(skill_tags):
+        for t in tags:
+            bits[row, bit_of[t]] = True
+            postings[t].append(skill_id)
+
+    for t in tag_codes:
+        entry = index.skill_tag.add()
+        entry.tag = t
+        entry.skill_id.extend(postings[t])
+    if tag_codes:
+        index.skill_tag_bitset = np.packbits(bits, axis=1, bitorder="little").tobytes()
+
+
+class SkillTagIndex:
+    def __init__(self, pb: data_pb2.UMDatabase):
+        index = pb.index
+        self.skill_ids = np.array(index.skill.id, dtype=np.int32)
+        self.tags = np.array([e.tag for e in index.skill_tag], dtype=np.int32)
+        self.postings = {
+            e.tag: np.array(e.skill_id, dtype=np.int32) for e in index.skill_tag
+        }
+        row_size = (len(self.tags) + 7) // 8
+        packed = np.frombuffer(index.skill_tag_bitset, dtype=np.uint8)
+        self.bits = np.unpackbits(
+            packed.reshape(len(self.skill_ids), row_size),
+            axis=1,
+            count=len(self.tags),
+            bitorder="little",
+        ).astype(bool)
+
+    def skills_with(self, tag: int) -> np.ndarray:
+        return self.postings.get(tag, np.empty(0, dtype=np.int32))
+
+    def tags_in(self, tag_range: tuple[int, int]) -> list:
+        return [t for t in self.tags.tolist() if in_range(t, tag_range)]
+
+    def _any(self, tags) -> np.ndarray:
+        if not tags:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate([self.skills_with(t) for t in tags]))
+
+    def query(self, all_of=(), any_of=(), groups=()) -> np.ndarray:
+        # all_of 内取交集，any_of 内取并集；groups 中每个区间要求至少带一个该区间的
+        # tag（如任一跑法）。各条件再取交集；结果为升序 skill id
+        result = None
+        for tag in sorted(all_of, key=lambda t: len(self.skills_with(t))):
+            ids = self.skills_with(tag)
+            result = ids if result is None else np.intersect1d(result, ids, True)
+        candidates = [self._any(any_of)] if any_of else []
+        candidates += [self._any(self.tags_in(r)) for r in groups]
+        for union in candidates:
+            result = union if result is None else np.intersect1d(result, union, True)
+        if result is None:
+            return self.skill_ids.copy()
+        return result
+
+    def tags_of(self, skill_id: int) -> list:
+        row = np.searchsorted(self.skill_ids, skill_id)
+        if row >= len(self.skill_ids) or self.skill_ids[row] != skill_id:
+            raise KeyError(f"unknown skill {skill_id}")
+        return self.tags[self.bits[row]].tolist()
+
+
+def _tag(value: str) -> int:
+    return TAG_NAMES[value.lower()] if value.lower() in TAG_NAMES else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query skills by SkillTag")
+    parser.add_argument("--umdb", default="assets/data/umdb.binarypb.gz")
+    parser.add_argument(
+        "--all", nargs="*", type=_tag, default=[], help="tag names or codes"
+    )
+    parser.add_argument(
+        "--any", nargs="*", type=_tag, default=[], help="tag names or codes"
+    )
+    parser.add_argument(
+        "--group",
+        nargs="*",
+        choices=TAG_GROUPS,
+        default=[],
+        help="require at least one tag from each group, e.g. any running style",
+    )
+    args = parser.parse_args()
+
+    with open(args.umdb, "rb") as f:
+        pb = data_pb2.UMDatabase.FromString(gzip.decompress(f.read()))
+    tag_index = SkillTagIndex(pb)
+    names = {s.id: s.name for s in pb.skill}
+    for skill_id in tag_index.query(
+        args.all, args.any, [TAG_GROUPS[g] for g in args.group]
+    ).tolist():
+        print(f"{skill_id}\t{names.get(skill_id, '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import struct
+
+import numpy as np
+
+import proto.data_pb2 as data_pb2
+from atomic_file import atomic_write
+
+# 文件布局（小端）：
+#   MAGIC | u16 len + version(utf-8) | u32 n |
+#   i32[n] chara_id（升序，下标即 chara 序号）|
+#   u16[n][n] pair | u16[n][n][n] triple
+# pair[a][b] / triple[a][b][c] 为同时包含这些 chara 的 SuccessionRelation 的
+# relation_point 之和，超过 65535 时截断；含重复 chara 的格子为 0。
+MAGIC = b"UMDBCMP1"
+COMPAT_FILENAME = "succession_compat.bin"
+POINT_MAX = np.iinfo(np.uint16).max
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+
+def chara_ordinals(pb: data_pb2.UMDatabase) -> np.ndarray:
+    ids = {c.id for c in pb.chara}
+    for relation in pb.succession_relation:
+        ids.update(m.chara_id for m in relation.member)
+    return np.array(sorted(ids), dtype=np.int32)
+
+
+def build_tables(pb: data_pb2.UMDatabase):
+    chara_ids = chara_ordinals(pb)
+    n = len(chara_ids)
+    # 直接在 uint16 上饱和累加，峰值内存与输出文件大小相同
+    pair = np.zeros((n, n), dtype="<u2")
+    triple = np.zeros((n, n, n), dtype="<u2")
+    for relation in pb.succession_relation:
+        members = np.unique([m.chara_id for m in relation.member])
+        point = min(max(relation.relation_point, 0), POINT_MAX)
+        if not len(members) or not point:
+            continue
+        m = np.searchsorted(chara_ids, members)
+        for table, ix in ((pair, np.ix_(m, m)), (triple, np.ix_(m, m, m))):
+            # 只在成员子块上升到 uint32 相加再截断，不会溢出回绕
+            table[ix] = np.minimum(table[ix].astype(np.uint32) + point, POINT_MAX)
+
+    ordinal = np.arange(n)
+    pair[ordinal, ordinal] = 0
+    triple[ordinal, ordinal, :] = 0
+    triple[ordinal, :, ordinal] = 0
+    triple[:, ordinal, ordinal] = 0
+    return chara_ids, pair, triple
+
+
+def write_compat(path: str, pb: data_pb2.UMDatabase):
+    chara_ids, pair, triple = build_tables(pb)
+    version = pb.version.encode("utf-8")
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(_U16.pack(len(version)))
+        f.write(version)
+        f.write(_U32.pack(len(chara_ids)))
+        f.write(chara_ids.astype("<i4").tobytes())
+        f.write(pair.tobytes())
+        f.write(triple.tobytes())
+
+
+class SuccessionCompat:
+    # pair / triple 为 memmap，按需从磁盘读取
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a succession compatibility file")
+            (version_len,) = _U16.unpack(f.read(_U16.size))
+            self.version = f.read(version_len).decode("utf-8")
+            (n,) = _U32.unpack(f.read(_U32.size))
+            offset = f.tell()
+        self.chara_ids = np.memmap(
+            path, dtype="<i4", mode="r", offset=offset, shape=(n,)
+        )
+        offset += 4 * n
+        if n:
+            self.pair = np.memmap(
+                path, dtype="<u2", mode="r", offset=offset, shape=(n, n)
+            )
+            offset += 2 * n * n
+            self.triple = np.memmap(
+                path, dtype="<u2", mode="r", offset=offset, shape=(n, n, n)
+            )
+        else:
+            self.pair = np.zeros((0, 0), dtype="<u2")
+            self.triple = np.zeros((0, 0, 0), dtype="<u2")
+
+    def ordinal(self, chara_id: int) -> int:
+        i = int(np.searchsorted(self.chara_ids, chara_id))
+        if i >= len(self.chara_ids) or self.chara_ids[i] != chara_id:
+            raise KeyError(f"unknown chara {chara_id}")
+        return i
+
+    def pair_point(self, a: int, b: int) -> int:
+        return int(self.pair[self.ordinal(a), self.ordinal(b)])
+
+    def triple_point(self, a: int, b: int, c: int) -> int:
+        return int(self.triple[self.ordinal(a), self.ordinal(b), self.ordinal(c)])
+
+    def top_partners(self, chara_id: int, k: int = 10) -> list:
+        # 返回 [(chara_id, point)]，按 point 降序、chara_id 升序
+        row = np.asarray(self.pair[self.ordinal(chara_id)])
+        order = np.lexsort((self.chara_ids, -row.astype(np.int64)))
+        order = order[order != self.ordinal(chara_id)][:k]
+        return [(int(self.chara_ids[i]), int(row[i])) for i in order]
+
+    def top_grandparents(self, chara_id: int, parent_id: int, k: int = 10) -> list:
+        # 子代与父代固定时，按 triple 点数排序候选祖代
+        a, b = self.ordinal(chara_id), self.ordinal(parent_id)
+        row = np.asarray(self.triple[a, b])
+        order = np.lexsort((self.chara_ids, -row.astype(np.int64)))
+        order = order[(order != a) & (order != b)][:k]
+        return [(int(self.chara_ids[i]), int(row[i])) for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query succession compatibility")
+    parser.add_argument("chara_id", type=int)
+    parser.add_argument("--parent_id", type=int, help="rank grandparents instead")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--path",
+        required=True,
+        help=f"{COMPAT_FILENAME} written by create_db.py --compat_dir",
+    )
+    args = parser.parse_args()
+
+    compat = SuccessionCompat(args.path)
+    if args.parent_id is None:
+        rows = compat.top_partners(args.chara_id, args.k)
+    else:
+        rows = compat.top_grandparents(args.chara_id, args.parent_id, args.k)
+    for chara_id, point in rows:
+        print(f"{chara_id}\t{point}")
+
+
+if __name__ == "__main__":
+    main()
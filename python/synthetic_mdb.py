@@ -0,0 +1,314 @@
+import argparse
+import os
+import random
+import sqlite3
+import struct
+import zlib
+
+# 只包含 create_db.py 中 populate_* 实际查询的表与列
+SCHEMA = """
+CREATE TABLE text_data (
+    id INTEGER, category INTEGER, "index" INTEGER, text TEXT,
+    PRIMARY KEY (category, "index")
+);
+CREATE TABLE support_card_data (
+    id INTEGER PRIMARY KEY, chara_id INTEGER, command_id INTEGER
+);
+CREATE TABLE succession_relation (
+    relation_type INTEGER PRIMARY KEY, relation_point INTEGER
+);
+CREATE TABLE succession_relation_member (
+    id INTEGER PRIMARY KEY, relation_type INTEGER, chara_id INTEGER
+);
+CREATE TABLE race_instance (id INTEGER PRIMARY KEY, race_id INTEGER);
+CREATE TABLE race (id INTEGER PRIMARY KEY, course_set INTEGER);
+CREATE TABLE race_course_set (
+    id INTEGER PRIMARY KEY, distance INTEGER, ground INTEGER
+);
+CREATE TABLE single_mode_wins_saddle (
+    id INTEGER PRIMARY KEY, priority INTEGER, group_id INTEGER,
+    win_saddle_type INTEGER,
+    race_instance_id_1 INTEGER, race_instance_id_2 INTEGER,
+    race_instance_id_3 INTEGER, race_instance_id_4 INTEGER,
+    race_instance_id_5 INTEGER, race_instance_id_6 INTEGER,
+    race_instance_id_7 INTEGER, race_instance_id_8 INTEGER
+);
+CREATE TABLE single_mode_program (
+    id INTEGER PRIMARY KEY, base_program_id INTEGER, race_instance_id INTEGER,
+    program_group INTEGER, race_permission INTEGER
+);
+CREATE TABLE single_mode_chara_program (
+    id INTEGER PRIMARY KEY, chara_id INTEGER, program_group INTEGER
+);
+CREATE TABLE skill_data (
+    id INTEGER PRIMARY KEY, grade_value INTEGER, tag_id TEXT
+);
+CREATE TABLE single_mode_live_square (
+    id INTEGER PRIMARY KEY, square_title_text_id INTEGER,
+    square_content_text_id INTEGER, master_bonus_id INTEGER,
+    square_type INTEGER,
+    perf_type_1 INTEGER, perf_value_1 INTEGER,
+    perf_type_2 INTEGER, perf_value_2 INTEGER,
+    perf_type_3 INTEGER, perf_value_3 INTEGER,
+    perf_type_4 INTEGER, perf_value_4 INTEGER,
+    perf_type_5 INTEGER, perf_value_5 INTEGER
+);
+"""
+
+# scale=1 时的行数，量级接近实际的 master.mdb
+DEFAULT_COUNTS = {
+    "chara": 120,
+    "card": 250,
+    "support_card": 320,
+    "succession_relation": 1000,
+    "race_instance": 1200,
+    "race_course_set": 120,
+    "wins_saddle": 150,
+    "program": 1500,
+    "chara_program": 400,
+    "skill": 1800,
+    "team_stadium_score_bonus": 60,
+    "story": 5000,
+    "live_square": 40,
+    # 其它 category 的 text_data，模拟 populate_* 不需要的大量文本
+    "filler_text": 50000,
+}
+
+SKILL_TAGS = [101, 102, 103, 104, 201, 202, 203, 204]
+SKILL_TAGS += [401, 402, 403, 404, 405, 406, 407, 501, 502, 801, 802]
+FILLER_CATEGORIES = (6, 8, 16, 23, 44, 48, 65, 76, 97, 128)
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+
+def scaled_counts(scale: float = 1.0, overrides=None) -> dict:
+    counts = {k: max(1, int(round(v * scale))) for k, v in DEFAULT_COUNTS.items()}
+    counts.update(overrides or {})
+    return counts
+
+
+def _name(rng: random.Random, prefix: str = "") -> str:
+    return prefix + "".join(rng.choice(KANA) for _ in range(rng.randint(3, 9)))
+
+
+def fake_png(rng: random.Random, size: int = 64) -> bytes:
+    # 最小的 8-bit 灰度 PNG，内容随机以避免被压缩得过小
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rows = b"".join(b"\x00" + rng.randbytes(size) for _ in range(size))
+    header = struct.pack(">IIBBBBB", size, size, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_icons(icon_dir: str, chara_ids, seed: int = 0, duplicate_ratio=0.1):
+    # 部分 chara 共用同一张图片，用于覆盖 --icon_mode pack 的去重
+    rng = random.Random(seed)
+    os.makedirs(icon_dir, exist_ok=True)
+    previous = None
+    for chara_id in chara_ids:
+        if previous is not None and rng.random() < duplicate_ratio:
+            data = previous
+        else:
+            data = fake_png(rng)
+        path = os.path.join(icon_dir, f"chr_icon_training_{chara_id}.png")
+        with open(path, "wb") as f:
+            f.write(data)
+        previous = data
+
+
+def generate(path: str, counts: dict, seed: int = 0) -> dict:
+    # 返回生成的 chara id 列表等信息，供生成图标使用
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    texts = []
+
+    chara_ids = [1001 + i for i in range(counts["chara"])]
+    for chara_id in chara_ids:
+        texts.append((170, chara_id, _name(rng)))
+        texts.append((7, chara_id, _name(rng)))
+
+    for i in range(counts["card"]):
+        card_id = 100101 + i
+        texts.append((5, card_id, "[" + _name(rng) + "]" + _name(rng)))
+
+    support_card_ids = [10001 + i for i in range(counts["support_card"])]
+    connection.executemany(
+        "INSERT INTO support_card_data VALUES (?, ?, ?);",
+        [
+            (i, rng.choice(chara_ids), rng.choice((101, 102, 103, 105, 106, 0)))
+            for i in support_card_ids
+        ],
+    )
+    texts.extend((75, i, "[" + _name(rng) + "]" + _name(rng)) for i in support_card_ids)
+
+    members = []
+    relations = []
+    for relation_type in range(1, counts["succession_relation"] + 1):
+        relations.append((relation_type, rng.randint(1, 30)))
+        # 多数关系为 2~3 人，少量为大组
+        size = rng.randint(2, 3) if rng.random() < 0.9 else rng.randint(4, 20)
+        for chara_id in rng.sample(chara_ids, min(size, len(chara_ids))):
+            members.append((len(members) + 1, relation_type, chara_id))
+    connection.executemany("INSERT INTO succession_relation VALUES (?, ?);", relations)
+    connection.executemany(
+        "INSERT INTO succession_relation_member VALUES (?, ?, ?);", members
+    )
+
+    course_sets = range(1, counts["race_course_set"] + 1)
+    connection.executemany(
+        "INSERT INTO race_course_set VALUES (?, ?, ?);",
+        [
+            (
+                i,
+                rng.choice((1000, 1200, 1400, 1600, 1800, 2000, 2400, 3200)),
+                rng.randint(1, 2),
+            )
+            for i in course_sets
+        ],
+    )
+    race_instance_ids = [100101 + i for i in range(counts["race_instance"])]
+    connection.executemany(
+        "INSERT INTO race VALUES (?, ?);",
+        [(i + 1, rng.choice(course_sets)) for i in range(len(race_instance_ids))],
+    )
+    connection.executemany(
+        "INSERT INTO race_instance VALUES (?, ?);",
+        [(ri, i + 1) for i, ri in enumerate(race_instance_ids)],
+    )
+    texts.extend((29, ri, _name(rng) + "ステークス") for ri in race_instance_ids)
+
+    saddles = []
+    for saddle_id in range(1, counts["wins_saddle"] + 1):
+        ids = rng.sample(race_instance_ids, rng.randint(1, 8))
+        saddles.append(
+            (saddle_id, rng.randint(1, 99), rng.randint(0, 20), rng.randint(0, 3))
+            + tuple(ids + [0] * (8 - len(ids)))
+        )
+        texts.append((111, saddle_id, _name(rng)))
+    connection.executemany(
+        "INSERT INTO single_mode_wins_saddle VALUES (%s);" % ", ".join("?" * 12),
+        saddles,
+    )
+
+    # 约 2/3 为 base program，其余指向某个 base program
+    programs = []
+    base_count = max(1, counts["program"] * 2 // 3)
+    for program_id in range(1, counts["program"] + 1):
+        base = 0 if program_id <= base_count else rng.randint(1, base_count)
+        programs.append(
+            (
+                program_id,
+                base,
+                rng.choice(race_instance_ids),
+                rng.randint(1, 50),
+                rng.randint(0, 8),
+            )
+        )
+    connection.executemany(
+        "INSERT INTO single_mode_program VALUES (?, ?, ?, ?, ?);", programs
+    )
+    connection.executemany(
+        "INSERT INTO single_mode_chara_program VALUES (?, ?, ?);",
+        [
+            (i, rng.choice(chara_ids), rng.randint(1, 50))
+            for i in range(1, counts["chara_program"] + 1)
+        ],
+    )
+
+    skills = []
+    for i in range(counts["skill"]):
+        skill_id = (100001 if i % 10 == 0 else 200001) + i
+        tags = rng.sample(SKILL_TAGS, rng.randint(1, 4))
+        skills.append((skill_id, rng.randint(-100, 600), "/".join(map(str, tags))))
+        texts.append((47, skill_id, _name(rng)))
+    connection.executemany("INSERT INTO skill_data VALUES (?, ?, ?);", skills)
+
+    texts.extend(
+        (148, i, _name(rng)) for i in range(1, counts["team_stadium_score_bonus"] + 1)
+    )
+
+    # 故事 id 覆盖 Data.ts 中 chara / support card 两种归属规则
+    for i in range(counts["story"]):
+        k = rng.randint(1, 999)
+        if i % 3 == 0:
+            story_id = (800000 + rng.choice(support_card_ids)) * 1000 + k
+        elif i % 3 == 1:
+            story_id = (500000 + rng.choice(chara_ids)) * 1000 + k
+        else:
+            story_id = 400000000 + i
+        texts.append((181, story_id, _name(rng)))
+
+    squares = []
+    for i in range(counts["live_square"]):
+        square_id = 40000 + i
+        pairs = [
+            (perf_type, rng.randint(5, 120))
+            for perf_type in sorted(rng.sample(range(1, 6), rng.randint(1, 5)))
+        ]
+        pairs += [(0, 0)] * (5 - len(pairs))
+        squares.append(
+            (square_id, square_id, square_id, rng.randint(1, 9), rng.randint(1, 3))
+            + tuple(x for p in pairs for x in p)
+        )
+        texts.append((209, square_id, _name(rng)))
+        texts.append((207, square_id, _name(rng) + "\\n" + _name(rng)))
+    connection.executemany(
+        "INSERT INTO single_mode_live_square VALUES (%s);" % ", ".join("?" * 15),
+        squares,
+    )
+
+    for i in range(counts["filler_text"]):
+        texts.append((FILLER_CATEGORIES[i % len(FILLER_CATEGORIES)], i, _name(rng)))
+
+    # text_data 按 (category, index) 去重，保留最后一次写入
+    rows = {(c, i): t for c, i, t in texts}
+    connection.executemany(
+        'INSERT INTO text_data (id, category, "index", text) VALUES (?, ?, ?, ?);',
+        [(n, c, i, t) for n, ((c, i), t) in enumerate(rows.items(), 1)],
+    )
+    connection.commit()
+    connection.close()
+    return {"chara_ids": chara_ids, "text_rows": len(rows)}
+
+
+def _count(value: str):
+    name, _, count = value.partition("=")
+    if name not in DEFAULT_COUNTS:
+        raise argparse.ArgumentTypeError(f"unknown table {name}")
+    return name, int(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic master.mdb")
+    parser.add_argument("--db_path", default="synthetic.mdb")
+    parser.add_argument("--icon_dir", help="also write fake chara icons here")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--count",
+        type=_count,
+        action="append",
+        default=[],
+        help="override a row count, e.g. skill=5000 (names: %s)"
+        % ", ".join(DEFAULT_COUNTS),
+    )
+    args = parser.parse_args()
+
+    counts = scaled_counts(args.scale, dict(args.count))
+    info = generate(args.db_path, counts, args.seed)
+    if args.icon_dir:
+        write_icons(args.icon_dir, info["chara_ids"], args.seed)
+    print(f"Wrote {args.db_path} ({info['text_rows']} text_data rows).")
+
+
+if __name__ == "__main__":
+    main()
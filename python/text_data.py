@@ -0,0 +1,33 @@
+import sqlite3
+from collections import defaultdict
+
+
+class TextData:
+    def __init__(self):
+        self.texts = {}
+        # 各 category 下的 index，保持 SQLite 的返回顺序
+        self.indexes = defaultdict(list)
+
+    @classmethod
+    def load(cls, cursor: sqlite3.Cursor, categories) -> "TextData":
+        data = cls()
+        categories = sorted(set(categories))
+        if not categories:
+            return data
+        # 一次查询读入所需的全部 category；master.mdb 只读打开，不能为 text_data 建索引，
+        # 内存中的 (category, index) 字典即充当索引
+        cursor.execute(
+            'SELECT category, "index", text FROM text_data WHERE category IN (%s);'
+            % ", ".join(str(c) for c in categories)
+        )
+        for category, index, text in cursor:
+            data.texts[(category, index)] = text
+            data.indexes[category].append(index)
+        return data
+
+    def get(self, category: int, index: int, default=None):
+        return self.texts.get((category, index), default)
+
+    def items(self, category: int):
+        for index in self.indexes.get(category, ()):
+            yield index, self.texts[(category, index)]
@@ -0,0 +1,171 @@
+import mmap
+import struct
+import zlib
+from collections import namedtuple
+
+import proto.data_pb2 as data_pb2
+from atomic_file import atomic_write
+
+# 文件布局：
+#   MAGIC | u32 header_size | header | section data ...
+# header：
+#   u16 len + version(utf-8) | u32 section_count |
+#   section_count * (u8 len + name | u64 offset | u64 length | u64 raw_length | u32 crc32)
+# 每个 section 是只含一个消息字段（repeated 字段或 index）的 UMDatabase 序列化结果，
+# 单独 zlib 压缩；
+# crc32 针对解压后的数据。offset 为相对文件头的绝对偏移。
+MAGIC = b"UMDBSEC1"
+SECTIONED_FILENAME = "umdb.sections"
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+SECTION_ENTRY = struct.Struct("<QQQI")
+
+SectionInfo = namedtuple("SectionInfo", ["offset", "length", "raw_length", "crc32"])
+
+
+def compress_section(offset: int, raw: bytes) -> tuple[bytes, bytes]:
+    # 返回 (SECTION_ENTRY, 压缩后的数据)
+    compressed = zlib.compress(raw, 9)
+    entry = SECTION_ENTRY.pack(offset, len(compressed), len(raw), zlib.crc32(raw))
+    return entry, compressed
+
+
+def decompress_section(data, info: SectionInfo, name: str) -> bytes:
+    raw = zlib.decompress(data[info.offset : info.offset + info.length])
+    if len(raw) != info.raw_length or zlib.crc32(raw) != info.crc32:
+        raise ValueError(f"checksum mismatch in {name}")
+    return raw
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def encode_repeated_field(field_number: int, messages) -> bytes:
+    # 与只设置该字段的 UMDatabase.SerializeToString() 结果一致，但无需复制消息
+    tag = encode_varint((field_number << 3) | 2)
+    parts = []
+    for m in messages:
+        data = m.SerializeToString()
+        parts.append(tag)
+        parts.append(encode_varint(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def section_fields(descriptor=data_pb2.UMDatabase.DESCRIPTOR):
+    return [f for f in descriptor.fields if f.type == f.TYPE_MESSAGE]
+
+
+def encode_field(pb, field) -> bytes:
+    if field.is_repeated:
+        return encode_repeated_field(field.number, getattr(pb, field.name))
+    if not pb.HasField(field.name):
+        return b""
+    return encode_repeated_field(field.number, [getattr(pb, field.name)])
+
+
+def write_sectioned(path: str, pb: data_pb2.UMDatabase):
+    sections = []
+    for field in section_fields():
+        sections.append((field.name, encode_field(pb, field)))
+
+    version = pb.version.encode("utf-8")
+    header_size = _U16.size + len(version) + _U32.size
+    for name, _ in sections:
+        header_size += 1 + len(name.encode("utf-8")) + SECTION_ENTRY.size
+
+    header = [_U16.pack(len(version)), version, _U32.pack(len(sections))]
+    payloads = []
+    offset = len(MAGIC) + _U32.size + header_size
+    for name, raw in sections:
+        entry, compressed = compress_section(offset, raw)
+        encoded_name = name.encode("utf-8")
+        header.append(bytes([len(encoded_name)]) + encoded_name)
+        header.append(entry)
+        payloads.append(compressed)
+        offset += len(compressed)
+
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(_U32.pack(header_size))
+        for chunk in header:
+            f.write(chunk)
+        for chunk in payloads:
+            f.write(chunk)
+
+
+class SectionedUMDB:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        try:
+            self.version, self.sections = self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self):
+        mm = self._mm
+        if mm[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a sectioned UMDB file")
+        pos = len(MAGIC)
+        (header_size,) = _U32.unpack_from(mm, pos)
+        pos += _U32.size
+        end = pos + header_size
+        (version_len,) = _U16.unpack_from(mm, pos)
+        pos += _U16.size
+        version = mm[pos : pos + version_len].decode("utf-8")
+        pos += version_len
+        (count,) = _U32.unpack_from(mm, pos)
+        pos += _U32.size
+        sections = {}
+        for _ in range(count):
+            name_len = mm[pos]
+            pos += 1
+            name = mm[pos : pos + name_len].decode("utf-8")
+            pos += name_len
+            sections[name] = SectionInfo(*SECTION_ENTRY.unpack_from(mm, pos))
+            pos += SECTION_ENTRY.size
+        if pos != end:
+            raise ValueError("corrupt sectioned UMDB header")
+        return version, sections
+
+    def read_section(self, name: str) -> bytes:
+        return decompress_section(self._mm, self.sections[name], f"section {name}")
+
+    def load(self, names=None) -> data_pb2.UMDatabase:
+        # names 为空时解码全部 UMDatabase 字段
+        fields = {f.name for f in section_fields()}
+        if names is None:
+            names = [n for n in self.sections if n in fields]
+        pb = data_pb2.UMDatabase()
+        pb.version = self.version
+        for name in names:
+            if name not in fields:
+                raise KeyError(f"{name} is not a UMDatabase field")
+            pb.MergeFromString(self.read_section(name))
+        return pb
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,398 @@
+import argparse
+import gzip
+import hashlib
+import struct
+import sys
+import zlib
+
+import proto.data_pb2 as data_pb2
+from atomic_file import atomic_write
+from umdb_container import encode_varint
+
+# 文件布局：
+#   MAGIC | u16 len + base_version | u16 len + target_version |
+#   sha256(base) | sha256(target) | u64 target_length | zlib(body)
+# 校验和针对未压缩的 UMDatabase 序列化结果。body 依字段号升序，每个有变化的字段：
+#   varint field_number | varint op
+#   OP_REPLACE：varint len + 目标中该字段的全部原始记录（tag 在内）
+#   OP_ENTITIES：removed、changed、added 三组实体，再加可选的保留实体顺序
+# 实体以 (key, 同 key 第几次出现) 标识，key 见 KEY_FIELDS，以 zigzag varint 编码。
+MAGIC = b"UMDBDLT1"
+DELTA_SUFFIX = ".umdelta"
+OP_REPLACE = 0
+OP_ENTITIES = 1
+
+# 默认以 id 为 key
+KEY_FIELDS = {
+    "SuccessionRelation": "relation_type",
+    "SpecialCaseRace": "race_instance_id",
+}
+
+_U16 = struct.Struct("<H")
+_HASHES = struct.Struct("<32s32sQ")
+
+
+def read_build(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        return gzip.decompress(data)
+    return data
+
+
+def write_build(path: str, data: bytes):
+    # 与 create_db.py 相同，gzip 使用 mtime=0 以保证输出稳定
+    with atomic_write(path) as f:
+        f.write(gzip.compress(data, mtime=0) if path.endswith(".gz") else data)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_varint(data, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def split_fields(data: bytes) -> dict:
+    # {field_number: [(原始记录, payload)]}；要求同一字段连续且字段号升序，
+    # 即 SerializeToString() 的输出
+    fields = {}
+    last = 0
+    pos = 0
+    while pos < len(data):
+        start = pos
+        tag, pos = _decode_varint(data, pos)
+        number, wire_type = tag >> 3, tag & 7
+        if wire_type == 0:
+            _, pos = _decode_varint(data, pos)
+            payload = None
+        elif wire_type == 1:
+            pos += 8
+            payload = None
+        elif wire_type == 2:
+            length, pos = _decode_varint(data, pos)
+            payload = data[pos : pos + length]
+            pos += length
+        elif wire_type == 5:
+            pos += 4
+            payload = None
+        else:
+            raise ValueError(f"unsupported wire type {wire_type} at {start}")
+        if number < last or (number != last and number in fields):
+            raise ValueError("not a canonical UMDatabase serialization")
+        last = number
+        fields.setdefault(number, []).append((data[start:pos], payload))
+    if pos != len(data):
+        raise ValueError("truncated UMDatabase serialization")
+    return fields
+
+
+def _entity_field(number: int):
+    field = data_pb2.UMDatabase.DESCRIPTOR.fields_by_number.get(number)
+    if field is None or not field.is_repeated or field.type != field.TYPE_MESSAGE:
+        return None
+    return field
+
+
+def entity_keys(field, payloads) -> list:
+    message_type = field.message_type
+    cls = getattr(data_pb2, message_type.name)
+    key_field = KEY_FIELDS.get(message_type.name, "id")
+    seen = {}
+    keys = []
+    for payload in payloads:
+        key = getattr(cls.FromString(payload), key_field)
+        keys.append((key, seen.get(key, 0)))
+        seen[key] = seen.get(key, 0) + 1
+    return keys
+
+
+def _version(fields: dict) -> str:
+    records = fields.get(data_pb2.UMDatabase.VERSION_FIELD_NUMBER)
+    return records[-1][1].decode("utf-8") if records else ""
+
+
+def _encode_key(key) -> bytes:
+    return encode_varint(_zigzag(key[0])) + encode_varint(key[1])
+
+
+def _encode_entities(out: bytearray, field, base, target) -> bool:
+    base_payloads = [p for _, p in base]
+    target_payloads = [p for _, p in target]
+    base_keys = entity_keys(field, base_payloads)
+    target_keys = entity_keys(field, target_payloads)
+    base_map = dict(zip(base_keys, base_payloads))
+    target_map = dict(zip(target_keys, target_payloads))
+
+    removed = [k for k in base_keys if k not in target_map]
+    changed = [
+        (k, target_map[k])
+        for k in base_keys
+        if k in target_map and target_map[k] != base_map[k]
+    ]
+    added = [
+        (i, k, target_payloads[i])
+        for i, k in enumerate(target_keys)
+        if k not in base_map
+    ]
+    # 保留下来的实体若相对顺序改变，需要记录目标中的顺序
+    kept = [k for k in target_keys if k in base_map]
+    reordered = kept != [k for k in base_keys if k in target_map]
+    if not (removed or changed or added or reordered):
+        return False
+
+    out += encode_varint(field.number) + encode_varint(OP_ENTITIES)
+    out += encode_varint(len(removed))
+    for k in removed:
+        out += _encode_key(k)
+    out += encode_varint(len(changed))
+    for k, payload in changed:
+        out += _encode_key(k) + encode_varint(len(payload)) + payload
+    out += encode_varint(len(added))
+    for position, k, payload in added:
+        out += _encode_key(k) + encode_varint(position)
+        out += encode_varint(len(payload)) + payload
+    out += encode_varint(len(kept) if reordered else 0)
+    if reordered:
+        for k in kept:
+            out += _encode_key(k)
+    return True
+
+
+def create_delta(base: bytes, target: bytes) -> bytes:
+    base_fields = split_fields(base)
+    target_fields = split_fields(target)
+    body = bytearray()
+    for number in sorted(set(base_fields) | set(target_fields)):
+        b = base_fields.get(number, [])
+        t = target_fields.get(number, [])
+        field = _entity_field(number)
+        if field is not None:
+            _encode_entities(body, field, b, t)
+        elif [r for r, _ in b] != [r for r, _ in t]:
+            blob = b"".join(r for r, _ in t)
+            body += encode_varint(number) + encode_varint(OP_REPLACE)
+            body += encode_varint(len(blob)) + blob
+
+    header = bytearray(MAGIC)
+    for version in (_version(base_fields), _version(target_fields)):
+        encoded = version.encode("utf-8")
+        header += _U16.pack(len(encoded)) + encoded
+    header += _HASHES.pack(
+        hashlib.sha256(base).digest(), hashlib.sha256(target).digest(), len(target)
+    )
+    delta = bytes(header) + zlib.compress(bytes(body), 9)
+    # 生成时即回放一次，保证该 delta 能逐字节还原 target
+    apply_delta(base, delta)
+    return delta
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def varint(self) -> int:
+        value, self.pos = _decode_varint(self.data, self.pos)
+        return value
+
+    def blob(self) -> bytes:
+        n = self.varint()
+        self.pos += n
+        return self.data[self.pos - n : self.pos]
+
+    def key(self):
+        return _unzigzag(self.varint()), self.varint()
+
+
+def read_header(delta: bytes) -> dict:
+    if delta[: len(MAGIC)] != MAGIC:
+        raise ValueError("not a UMDB delta")
+    pos = len(MAGIC)
+    versions = []
+    for _ in range(2):
+        (n,) = _U16.unpack_from(delta, pos)
+        pos += _U16.size
+        versions.append(delta[pos : pos + n].decode("utf-8"))
+        pos += n
+    base_sha, target_sha, target_length = _HASHES.unpack_from(delta, pos)
+    return {
+        "base_version": versions[0],
+        "target_version": versions[1],
+        "base_sha256": base_sha,
+        "target_sha256": target_sha,
+        "target_length": target_length,
+        "body_offset": pos + _HASHES.size,
+    }
+
+
+def read_ops(delta: bytes) -> dict:
+    # {field_number: ("replace", blob) 或 ("entities", removed, changed, added, order)}
+    header = read_header(delta)
+    r = _Reader(zlib.decompress(delta[header["body_offset"] :]))
+    ops = {}
+    while r.pos < len(r.data):
+        number = r.varint()
+        op = r.varint()
+        if op == OP_REPLACE:
+            ops[number] = ("replace", r.blob())
+            continue
+        if op != OP_ENTITIES:
+            raise ValueError(f"unknown delta op {op}")
+        removed = {r.key() for _ in range(r.varint())}
+        changed = {}
+        for _ in range(r.varint()):
+            key = r.key()
+            changed[key] = r.blob()
+        added = []
+        for _ in range(r.varint()):
+            key = r.key()
+            position = r.varint()
+            added.append((position, key, r.blob()))
+        order = [r.key() for _ in range(r.varint())] or None
+        ops[number] = ("entities", removed, changed, added, order)
+    return ops
+
+
+def _apply_entities(field, base, removed, changed, added, order) -> list:
+    base_payloads = [p for _, p in base]
+    payloads = dict(zip(entity_keys(field, base_payloads), base_payloads))
+    missing = (removed | set(changed)) - set(payloads)
+    if missing:
+        raise ValueError(f"{field.name}: entities {sorted(missing)} not in base")
+    payloads.update(changed)
+    kept = order or [k for k in payloads if k not in removed]
+    out = []
+    kept_iter = iter(kept)
+    for position, key, payload in sorted(added):
+        while len(out) < position:
+            out.append(payloads[next(kept_iter)])
+        out.append(payload)
+    out.extend(payloads[k] for k in kept_iter)
+
+    tag = encode_varint((field.number << 3) | 2)
+    return [tag + encode_varint(len(p)) + p for p in out]
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    header = read_header(delta)
+    base_fields = split_fields(base)
+    base_version = _version(base_fields)
+    if base_version != header["base_version"]:
+        raise ValueError(
+            f"delta is for base version {header['base_version']!r}, "
+            f"got {base_version!r}"
+        )
+    if hashlib.sha256(base).digest() != header["base_sha256"]:
+        raise ValueError(
+            f"base checksum mismatch: version {base_version!r} is a different build"
+        )
+
+    ops = read_ops(delta)
+    parts = []
+    for number in sorted(set(base_fields) | set(ops)):
+        base_records = base_fields.get(number, [])
+        op = ops.get(number)
+        if op is None:
+            parts.extend(r for r, _ in base_records)
+        elif op[0] == "replace":
+            parts.append(op[1])
+        else:
+            field = _entity_field(number)
+            if field is None:
+                raise ValueError(f"field {number} does not hold entities")
+            parts.extend(_apply_entities(field, base_records, *op[1:]))
+    target = b"".join(parts)
+    if (
+        len(target) != header["target_length"]
+        or hashlib.sha256(target).digest() != header["target_sha256"]
+    ):
+        raise ValueError("patched build does not match the target checksum")
+    return target
+
+
+def describe(delta: bytes) -> dict:
+    header = read_header(delta)
+    fields = {}
+    for number, op in read_ops(delta).items():
+        field = data_pb2.UMDatabase.DESCRIPTOR.fields_by_number.get(number)
+        name = field.name if field is not None else str(number)
+        if op[0] == "replace":
+            fields[name] = {"replaced_bytes": len(op[1])}
+        else:
+            fields[name] = {
+                "removed": len(op[1]),
+                "changed": len(op[2]),
+                "added": len(op[3]),
+                "reordered": op[4] is not None,
+            }
+    return {
+        "base_version": header["base_version"],
+        "target_version": header["target_version"],
+        "target_sha256": header["target_sha256"].hex(),
+        "target_length": header["target_length"],
+        "delta_length": len(delta),
+        "fields": fields,
+    }
+
+
+def _print_description(info: dict):
+    print(
+        f"{info['base_version']} -> {info['target_version']}: "
+        f"{info['delta_length']} bytes for a {info['target_length']} byte build"
+    )
+    for name, counts in info["fields"].items():
+        print(f"  {name}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta patches between UMDB builds")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("create", help="compute a delta from base to target")
+    p.add_argument("--base", required=True, help="umdb.binarypb(.gz) to patch from")
+    p.add_argument("--target", required=True, help="umdb.binarypb(.gz) to reproduce")
+    p.add_argument("--output", default="umdb" + DELTA_SUFFIX)
+
+    p = sub.add_parser("apply", help="apply a delta to a base build")
+    p.add_argument("--base", required=True)
+    p.add_argument("--delta", required=True)
+    p.add_argument("--output", required=True, help="gzip compressed if it ends in .gz")
+
+    p = sub.add_parser("info", help="summarize a delta")
+    p.add_argument("delta")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        delta = create_delta(read_build(args.base), read_build(args.target))
+        with open(args.output, "wb") as f:
+            f.write(delta)
+        _print_description(describe(delta))
+    elif args.command == "apply":
+        with open(args.delta, "rb") as f:
+            delta = f.read()
+        try:
+            target = apply_delta(read_build(args.base), delta)
+        except ValueError as e:
+            sys.exit(f"Cannot apply {args.delta}: {e}")
+        write_build(args.output, target)
+        print(f"Wrote {args.output}")
+    else:
+        with open(args.delta, "rb") as f:
+            _print_description(describe(f.read()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from bisect import bisect_left
+
+import proto.data_pb2 as data_pb2
+from live_plan import build_live_matrix
+from skill_tags import build_skill_tag_index
+
+# UMDatabaseIndex.IdIndex 字段与 UMDatabase 中对应的 repeated 字段同名
+ID_INDEX_FIELDS = (
+    "chara",
+    "card",
+    "support_card",
+    "race_instance",
+    "skill",
+    "live_song",
+)
+
+
+def build_id_index(messages, out: data_pb2.UMDatabaseIndex.IdIndex):
+    # 重复 id 取最后一个，与按 id 写入 Record 的旧行为一致
+    positions = {m.id: i for i, m in enumerate(messages) if m.HasField("id")}
+    ids = sorted(positions)
+    out.id.extend(ids)
+    out.position.extend(positions[i] for i in ids)
+
+
+def build_index(pb: data_pb2.UMDatabase) -> data_pb2.UMDatabaseIndex:
+    index = data_pb2.UMDatabaseIndex()
+    index.version = pb.version
+    for name in ID_INDEX_FIELDS:
+        build_id_index(getattr(pb, name), getattr(index, name))
+
+    build_skill_tag_index(pb, index)
+    build_live_matrix(pb, index)
+    return index
+
+
+def find_position(id_index: data_pb2.UMDatabaseIndex.IdIndex, entity_id: int) -> int:
+    # 二分查找，找不到时返回 -1
+    i = bisect_left(id_index.id, entity_id)
+    if i < len(id_index.id) and id_index.id[i] == entity_id:
+        return id_index.position[i]
+    return -1
+
+
+def lookup(pb: data_pb2.UMDatabase, field: str, entity_id: int):
+    position = find_position(getattr(pb.index, field), entity_id)
+    return getattr(pb, field)[position] if position >= 0 else None
@@ -12,7 +12,7 @@ import {
   StoryDetail,
 } from 'types/gameTypes';
 import { isUMASingleModelResponse } from 'types/ingame/UMASingleModelResponse';
-import { UMDB } from './Data';
+import { findById, resolveIconUrl } from './Data';
 
 const PERF_TYPE_TO_NOTE_KEY: Record<number, keyof NoteStat> = {
   1: 'da',
@@ -160,7 +160,7 @@ export async function extractCoreInfo(
 
   const songStats: SongStat[] | undefined = liveData?.next_square_info_array
     ?.map((square) => {
-      const song = UMDB.liveSongs[square.square_id];
+      const song = findById('liveSong', square.square_id);
       if (!song) {
         return undefined;
       }
@@ -249,15 +249,15 @@ export async function extractCoreInfo(
     };
     if (matchedCard) {
       result.supportCardId = matchedCard.support_card_id;
-      const supportCard = UMDB.supportCards[matchedCard.support_card_id];
+      const supportCard = findById('supportCard', matchedCard.support_card_id);
       result.charaPath = supportCard
-        ? (UMDB.charas[supportCard.charaId!]?.iconUrl ?? '')
+        ? resolveIconUrl(findById('chara', supportCard.charaId!)?.iconUrl)
         : '';
       result.limitBreak = matchedCard.limit_break_count;
       result.exp = matchedCard.exp;
     }
     if (position >= 1000) {
-      result.charaPath = UMDB.charas[position]?.iconUrl ?? '';
+      result.charaPath = resolveIconUrl(findById('chara', position)?.iconUrl);
     }
     return result;
   });
@@ -1,31 +1,100 @@
 import fs from 'fs';
 import path from 'path';
 import log from 'electron-log';
-import _ from 'lodash';
 import { ASSETS_PATH } from 'main/paths';
 import pako from 'pako';
 import {
-  Card,
-  Chara,
-  LiveSong,
-  RaceInstance,
-  Skill,
-  SupportCard,
   UMDatabase,
+  UMDatabaseIndex,
+  UMDatabaseIndex_IdIndex,
 } from 'umdb/data_pb';
-import { Story } from 'umdb/UMDatabaseUtils';
 
-export const UMDB = {
-  charas: {} as Record<number, Chara>,
-  cards: {} as Record<number, Card>,
-  supportCards: {} as Record<number, SupportCard>,
-  liveSongs: {} as Record<number, LiveSong>,
-  successionRelationMemberCharaIds: {} as Record<number, Set<number>>,
-  raceInstances: {} as Record<number, RaceInstance>,
-  skills: {} as Record<number, Skill>,
-  interestingRaceInstances: [] as RaceInstance[],
-  stories: [] as Story[],
-};
+type IndexedTable =
+  | 'chara'
+  | 'card'
+  | 'supportCard'
+  | 'raceInstance'
+  | 'skill'
+  | 'liveSong';
+
+let db = new UMDatabase();
+let dbIndex = new UMDatabaseIndex();
+
+function bisect(ids: number[], id: number): number {
+  let lo = 0;
+  let hi = ids.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (ids[mid] < id) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+export function findById<K extends IndexedTable>(
+  table: K,
+  id: number,
+): UMDatabase[K][number] | undefined {
+  const idIndex = dbIndex[table];
+  if (!idIndex) return undefined;
+  const i = bisect(idIndex.id, id);
+  if (idIndex.id[i] !== id) return undefined;
+  return db[table][idIndex.position[i]];
+}
+
+function idIndexOf(items: { id?: number }[]): UMDatabaseIndex_IdIndex {
+  const positions = new Map<number, number>();
+  items.forEach((item, i) => {
+    if (item.id != null) positions.set(item.id, i);
+  });
+  const id = Array.from(positions.keys()).sort((a, b) => a - b);
+  return new UMDatabaseIndex_IdIndex({
+    id,
+    position: id.map((i) => positions.get(i)!),
+  });
+}
+
+// 仅用于没有 index 或 index 版本不符的旧数据文件，规则与 python/umdb_index.py 一致
+function deriveIndex(umdb: UMDatabase): UMDatabaseIndex {
+  return new UMDatabaseIndex({
+    version: umdb.version,
+    chara: idIndexOf(umdb.chara),
+    card: idIndexOf(umdb.card),
+    supportCard: idIndexOf(umdb.supportCard),
+    raceInstance: idIndexOf(umdb.raceInstance),
+    skill: idIndexOf(umdb.skill),
+    liveSong: idIndexOf(umdb.liveSong),
+  });
+}
+
+// create_db.py --icon_mode pack 时 iconUrl 为 "chr_icon.pack#<offset>:<length>"
+const ICON_PACK_REF = /^([^#]+)#(\d+):(\d+)$/;
+const iconCache = new Map<string, string>();
+
+export function resolveIconUrl(iconUrl?: string): string {
+  if (!iconUrl) return '';
+  const match = ICON_PACK_REF.exec(iconUrl);
+  if (!match) return iconUrl;
+  const cached = iconCache.get(iconUrl);
+  if (cached) return cached;
+  try {
+    const offset = Number(match[2]);
+    const length = Number(match[3]);
+    const buffer = Buffer.alloc(length);
+    const fd = fs.openSync(path.join(ASSETS_PATH, 'data', match[1]), 'r');
+    try {
+      fs.readSync(fd, buffer, 0, length, offset);
+    } finally {
+      fs.closeSync(fd);
+    }
+    const dataUrl = `data:image/png;base64,${buffer.toString('base64')}`;
+    iconCache.set(iconUrl, dataUrl);
+    return dataUrl;
+  } catch (err: any) {
+    log.error(`[UMDB] ❌ Icon load error: ${err.message}`);
+    return '';
+  }
+}
 
 export function UMDBload() {
   try {
@@ -37,47 +106,13 @@ export function UMDBload() {
     const gzData = fs.readFileSync(filePath);
     const inflated = pako.inflate(gzData);
     const umdb = UMDatabase.fromBinary(inflated);
-    // ---- chara
-    umdb.chara.forEach((c) => (UMDB.charas[c.id!] = c));
-    // ---- card
-    umdb.card.forEach((card) => (UMDB.cards[card.id!] = card));
-    // ---- support card
-    umdb.supportCard.forEach((card) => (UMDB.supportCards[card.id!] = card));
-    // ---- succession relation
-    umdb.successionRelation.forEach((relation) => {
-      UMDB.successionRelationMemberCharaIds[relation.relationType!] = new Set(
-        relation.member.map((m) => m.charaId!),
-      );
-    });
-    // ---- race instance
-    umdb.raceInstance.forEach((race) => (UMDB.raceInstances[race.id!] = race));
-    // ---- skills
-    umdb.skill.forEach((skill) => (UMDB.skills[skill.id!] = skill));
-    // ---- interesting races
-    UMDB.interestingRaceInstances = _.sortedUniq(
-      umdb.winsSaddle.flatMap((ws) => ws.raceInstanceId),
-    ).map((id) => UMDB.raceInstances[id]);
-    // ---- stories
-    UMDB.stories = umdb.story.map((story) => {
-      const o: Story = { id: story.id!, name: story.name! };
-      const id = story.id!;
-
-      if (
-        (501000000 <= id && id < 510000000) ||
-        (801000000 <= id && id < 810000000)
-      ) {
-        o.chara = UMDB.charas[Math.floor(id / 1000) % 10000];
-      } else if (810000000 <= id && id < 840000000) {
-        o.supportCard = UMDB.supportCards[Math.floor(id / 1000) % 100000];
-      }
-      return o;
-    });
-    // ---- live songs
-    umdb.liveSong.forEach((song) => {
-      if (song.id != null) {
-        UMDB.liveSongs[song.id] = song;
-      }
-    });
+    if (umdb.index && umdb.index.version === umdb.version) {
+      dbIndex = umdb.index;
+    } else {
+      log.warn(`[UMDB] ⚠️ Index missing or stale, deriving at startup`);
+      dbIndex = deriveIndex(umdb);
+    }
+    db = umdb;
   } catch (err) {
     console.error('[UMDB] ❌ Load error:', err);
   }
@@ -93,7 +128,25 @@ export function handleDataLoad(ipcMain: Electron.IpcMain) {
     const buffer = fs.readFileSync(fullPath);
     return `data:image/png;base64,${buffer.toString('base64')}`;
   });
+  // 只传各表与排好序的 id/position 数组，渲染进程按需二分查找，
+  // 不在主进程逐个构建 id→对象的 Record
   ipcMain.handle('umdb-get', () => {
-    return UMDB;
+    const tables: IndexedTable[] = [
+      'chara',
+      'card',
+      'supportCard',
+      'raceInstance',
+      'skill',
+      'liveSong',
+    ];
+    return {
+      tables: Object.fromEntries(tables.map((t) => [t, db[t]])),
+      index: Object.fromEntries(
+        tables.map((t) => [
+          t,
+          { id: dbIndex[t]?.id ?? [], position: dbIndex[t]?.position ?? [] },
+        ]),
+      ),
+    };
   });
 }
@@ -1,14 +1,82 @@
-import { LiveSong, RaceInstance, Skill, SupportCard } from 'umdb/data_pb';
+import {
+  Card,
+  Chara,
+  LiveSong,
+  RaceInstance,
+  Skill,
+  SupportCard,
+} from 'umdb/data_pb';
 
-let umdbInstance: any = null;
-let loadPromise: Promise<any> | null = null;
+type IdIndex = { id: number[]; position: number[] };
+
+// 与 src/main/handle/Data.ts 中 'umdb-get' 的返回值一致
+type UMDBSnapshot = {
+  tables: {
+    chara: Chara[];
+    card: Card[];
+    supportCard: SupportCard[];
+    raceInstance: RaceInstance[];
+    skill: Skill[];
+    liveSong: LiveSong[];
+  };
+  index: Record<keyof UMDBSnapshot['tables'], IdIndex>;
+};
+
+type UMDBTables = {
+  charas: Record<number, Chara>;
+  cards: Record<number, Card>;
+  supportCards: Record<number, SupportCard>;
+  raceInstances: Record<number, RaceInstance>;
+  skills: Record<number, Skill>;
+  liveSongs: Record<number, LiveSong>;
+};
+
+let umdbInstance: UMDBTables | null = null;
+let loadPromise: Promise<UMDBTables> | null = null;
+
+function bisect(ids: number[], id: number): number {
+  let lo = 0;
+  let hi = ids.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (ids[mid] < id) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// 以 Record 形式访问，但每次 [id] / in 都是对 id 数组的二分查找
+function lookupTable<T>(rows: T[], idIndex: IdIndex): Record<number, T> {
+  const find = (key: string | symbol): number => {
+    if (typeof key !== 'string') return -1;
+    const id = Number(key);
+    const i = bisect(idIndex.id, id);
+    return idIndex.id[i] === id ? idIndex.position[i] : -1;
+  };
+  return new Proxy({} as Record<number, T>, {
+    get: (_target, key) => {
+      const position = find(key);
+      return position < 0 ? undefined : rows[position];
+    },
+    has: (_target, key) => find(key) >= 0,
+  });
+}
 
 export function loadUMDB() {
   if (!loadPromise) {
-    loadPromise = window.electron.utils.getUmaDatabase().then((db) => {
-      umdbInstance = db;
-      return db;
-    });
+    loadPromise = window.electron.utils
+      .getUmaDatabase()
+      .then(({ tables, index }: UMDBSnapshot) => {
+        umdbInstance = {
+          charas: lookupTable(tables.chara, index.chara),
+          cards: lookupTable(tables.card, index.card),
+          supportCards: lookupTable(tables.supportCard, index.supportCard),
+          raceInstances: lookupTable(tables.raceInstance, index.raceInstance),
+          skills: lookupTable(tables.skill, index.skill),
+          liveSongs: lookupTable(tables.liveSong, index.liveSong),
+        };
+        return umdbInstance;
+      });
   }
   return loadPromise;
 }
@@ -18,7 +86,7 @@ export const UMDB = {
     return umdbInstance;
   },
 
-  get charas() {
+  get charas(): Record<number, Chara> {
     return umdbInstance?.charas ?? {};
   },
   get raceInstances(): Record<number, RaceInstance> {
@@ -27,7 +95,7 @@ export const UMDB = {
   get supportCards(): Record<number, SupportCard> {
     return umdbInstance?.supportCards ?? {};
   },
-  get cards() {
+  get cards(): Record<number, Card> {
     return umdbInstance?.cards ?? {};
   },
   get skills(): Record<number, Skill> {
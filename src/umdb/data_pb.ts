@@ -70,6 +70,13 @@ export class UMDatabase extends Message<UMDatabase> {
    */
   liveSong: LiveSong[] = [];
 
+  /**
+   * Derived lookup tables, computed by create_db.py at build time.
+   *
+   * @generated from field: optional hakuraku.UMDatabaseIndex index = 13;
+   */
+  index?: UMDatabaseIndex;
+
   constructor(data?: PartialMessage<UMDatabase>) {
     super();
     proto2.util.initPartial(data, this);
@@ -90,6 +97,7 @@ export class UMDatabase extends Message<UMDatabase> {
     { no: 8, name: "team_stadium_score_bonus", kind: "message", T: TeamStadiumScoreBonus, repeated: true },
     { no: 10, name: "story", kind: "message", T: Story, repeated: true },
     { no: 12, name: "live_song", kind: "message", T: LiveSong, repeated: true },
+    { no: 13, name: "index", kind: "message", T: UMDatabaseIndex, opt: true },
   ]);
 
   static fromBinary(bytes: Uint8Array, options?: Partial<BinaryReadOptions>): UMDatabase {
@@ -109,6 +117,221 @@ export class UMDatabase extends Message<UMDatabase> {
   }
 }
 
+/**
+ * @generated from message hakuraku.UMDatabaseIndex
+ */
+export class UMDatabaseIndex extends Message<UMDatabaseIndex> {
+  /**
+   * UMDatabase.version of the build this index was computed from.
+   *
+   * @generated from field: optional string version = 1;
+   */
+  version?: string;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex chara = 2;
+   */
+  chara?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex card = 3;
+   */
+  card?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex support_card = 4;
+   */
+  supportCard?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex race_instance = 5;
+   */
+  raceInstance?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex skill = 6;
+   */
+  skill?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * @generated from field: optional hakuraku.UMDatabaseIndex.IdIndex live_song = 7;
+   */
+  liveSong?: UMDatabaseIndex_IdIndex;
+
+  /**
+   * Sorted by tag.
+   *
+   * @generated from field: repeated hakuraku.UMDatabaseIndex.SkillTagPostings skill_tag = 12;
+   */
+  skillTag: UMDatabaseIndex_SkillTagPostings[] = [];
+
+  /**
+   * One row of (skill_tag_size + 7) / 8 bytes per skill, parallel to skill.id.
+   * Bit i (little-endian bit order) is set when the skill has skill_tag[i].tag.
+   *
+   * @generated from field: optional bytes skill_tag_bitset = 13;
+   */
+  skillTagBitset?: Uint8Array;
+
+  /**
+   * Dense live square table; rows are parallel to live_song.id.
+   * Columns of live_perf_value, sorted ascending.
+   *
+   * @generated from field: repeated int32 live_perf_type = 14 [packed = true];
+   */
+  livePerfType: number[] = [];
+
+  /**
+   * Row-major (live_song.id size) x (live_perf_type size); 0 when the square
+   * has no value for that perf_type.
+   *
+   * @generated from field: repeated int32 live_perf_value = 15 [packed = true];
+   */
+  livePerfValue: number[] = [];
+
+  /**
+   * @generated from field: repeated int32 live_square_type = 16 [packed = true];
+   */
+  liveSquareType: number[] = [];
+
+  /**
+   * @generated from field: repeated int32 live_master_bonus_id = 17 [packed = true];
+   */
+  liveMasterBonusId: number[] = [];
+
+  constructor(data?: PartialMessage<UMDatabaseIndex>) {
+    super();
+    proto2.util.initPartial(data, this);
+  }
+
+  static readonly runtime: typeof proto2 = proto2;
+  static readonly typeName = "hakuraku.UMDatabaseIndex";
+  static readonly fields: FieldList = proto2.util.newFieldList(() => [
+    { no: 1, name: "version", kind: "scalar", T: 9 /* ScalarType.STRING */, opt: true },
+    { no: 2, name: "chara", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 3, name: "card", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 4, name: "support_card", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 5, name: "race_instance", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 6, name: "skill", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 7, name: "live_song", kind: "message", T: UMDatabaseIndex_IdIndex, opt: true },
+    { no: 12, name: "skill_tag", kind: "message", T: UMDatabaseIndex_SkillTagPostings, repeated: true },
+    { no: 13, name: "skill_tag_bitset", kind: "scalar", T: 12 /* ScalarType.BYTES */, opt: true },
+    { no: 14, name: "live_perf_type", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+    { no: 15, name: "live_perf_value", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+    { no: 16, name: "live_square_type", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+    { no: 17, name: "live_master_bonus_id", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+  ]);
+
+  static fromBinary(bytes: Uint8Array, options?: Partial<BinaryReadOptions>): UMDatabaseIndex {
+    return new UMDatabaseIndex().fromBinary(bytes, options);
+  }
+
+  static fromJson(jsonValue: JsonValue, options?: Partial<JsonReadOptions>): UMDatabaseIndex {
+    return new UMDatabaseIndex().fromJson(jsonValue, options);
+  }
+
+  static fromJsonString(jsonString: string, options?: Partial<JsonReadOptions>): UMDatabaseIndex {
+    return new UMDatabaseIndex().fromJsonString(jsonString, options);
+  }
+
+  static equals(a: UMDatabaseIndex | PlainMessage<UMDatabaseIndex> | undefined, b: UMDatabaseIndex | PlainMessage<UMDatabaseIndex> | undefined): boolean {
+    return proto2.util.equals(UMDatabaseIndex, a, b);
+  }
+}
+
+/**
+ * id is sorted ascending; position is the offset of the entity with that id
+ * in the corresponding UMDatabase field. Duplicate ids keep the last entity.
+ *
+ * @generated from message hakuraku.UMDatabaseIndex.IdIndex
+ */
+export class UMDatabaseIndex_IdIndex extends Message<UMDatabaseIndex_IdIndex> {
+  /**
+   * @generated from field: repeated int32 id = 1 [packed = true];
+   */
+  id: number[] = [];
+
+  /**
+   * @generated from field: repeated int32 position = 2 [packed = true];
+   */
+  position: number[] = [];
+
+  constructor(data?: PartialMessage<UMDatabaseIndex_IdIndex>) {
+    super();
+    proto2.util.initPartial(data, this);
+  }
+
+  static readonly runtime: typeof proto2 = proto2;
+  static readonly typeName = "hakuraku.UMDatabaseIndex.IdIndex";
+  static readonly fields: FieldList = proto2.util.newFieldList(() => [
+    { no: 1, name: "id", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+    { no: 2, name: "position", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+  ]);
+
+  static fromBinary(bytes: Uint8Array, options?: Partial<BinaryReadOptions>): UMDatabaseIndex_IdIndex {
+    return new UMDatabaseIndex_IdIndex().fromBinary(bytes, options);
+  }
+
+  static fromJson(jsonValue: JsonValue, options?: Partial<JsonReadOptions>): UMDatabaseIndex_IdIndex {
+    return new UMDatabaseIndex_IdIndex().fromJson(jsonValue, options);
+  }
+
+  static fromJsonString(jsonString: string, options?: Partial<JsonReadOptions>): UMDatabaseIndex_IdIndex {
+    return new UMDatabaseIndex_IdIndex().fromJsonString(jsonString, options);
+  }
+
+  static equals(a: UMDatabaseIndex_IdIndex | PlainMessage<UMDatabaseIndex_IdIndex> | undefined, b: UMDatabaseIndex_IdIndex | PlainMessage<UMDatabaseIndex_IdIndex> | undefined): boolean {
+    return proto2.util.equals(UMDatabaseIndex_IdIndex, a, b);
+  }
+}
+
+/**
+ * Inverted index over Skill.tag_id parsed as SkillTag codes (see Skill).
+ *
+ * @generated from message hakuraku.UMDatabaseIndex.SkillTagPostings
+ */
+export class UMDatabaseIndex_SkillTagPostings extends Message<UMDatabaseIndex_SkillTagPostings> {
+  /**
+   * @generated from field: optional int32 tag = 1;
+   */
+  tag?: number;
+
+  /**
+   * Sorted skill ids.
+   *
+   * @generated from field: repeated int32 skill_id = 2 [packed = true];
+   */
+  skillId: number[] = [];
+
+  constructor(data?: PartialMessage<UMDatabaseIndex_SkillTagPostings>) {
+    super();
+    proto2.util.initPartial(data, this);
+  }
+
+  static readonly runtime: typeof proto2 = proto2;
+  static readonly typeName = "hakuraku.UMDatabaseIndex.SkillTagPostings";
+  static readonly fields: FieldList = proto2.util.newFieldList(() => [
+    { no: 1, name: "tag", kind: "scalar", T: 5 /* ScalarType.INT32 */, opt: true },
+    { no: 2, name: "skill_id", kind: "scalar", T: 5 /* ScalarType.INT32 */, repeated: true, packed: true },
+  ]);
+
+  static fromBinary(bytes: Uint8Array, options?: Partial<BinaryReadOptions>): UMDatabaseIndex_SkillTagPostings {
+    return new UMDatabaseIndex_SkillTagPostings().fromBinary(bytes, options);
+  }
+
+  static fromJson(jsonValue: JsonValue, options?: Partial<JsonReadOptions>): UMDatabaseIndex_SkillTagPostings {
+    return new UMDatabaseIndex_SkillTagPostings().fromJson(jsonValue, options);
+  }
+
+  static fromJsonString(jsonString: string, options?: Partial<JsonReadOptions>): UMDatabaseIndex_SkillTagPostings {
+    return new UMDatabaseIndex_SkillTagPostings().fromJsonString(jsonString, options);
+  }
+
+  static equals(a: UMDatabaseIndex_SkillTagPostings | PlainMessage<UMDatabaseIndex_SkillTagPostings> | undefined, b: UMDatabaseIndex_SkillTagPostings | PlainMessage<UMDatabaseIndex_SkillTagPostings> | undefined): boolean {
+    return proto2.util.equals(UMDatabaseIndex_SkillTagPostings, a, b);
+  }
+}
+
 /**
  * @generated from message hakuraku.Chara
  */